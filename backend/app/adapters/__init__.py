@@ -1,15 +1,176 @@
-from .surya import SuryaAdapter
-from .docling import DoclingAdapter
-from .mineru import MinerUAdapter
-
-ADAPTERS = {
-    "surya": SuryaAdapter(),
-    "docling": DoclingAdapter(),
-    "mineru": MinerUAdapter(),
+"""Adapter registry.
+
+Adapters are declared as ``"module:Class"`` specs and only imported when a
+model is first used (or warmed up), so importing the app does not load any
+model code. Besides the built-ins, adapters can come from the
+``pdf_playground.adapters`` entry point group of installed packages or from
+the EXTRA_ADAPTERS setting (``name=module:Class,...``).
+"""
+from __future__ import annotations
+from contextlib import contextmanager
+from importlib import import_module
+from typing import Any, Dict, Iterator, List, Optional
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+ENTRY_POINT_GROUP = "pdf_playground.adapters"
+
+_BUILTIN_ADAPTERS = {
+    "surya": f"{__name__}.surya:SuryaAdapter",
+    "docling": f"{__name__}.docling:DoclingAdapter",
+    "mineru": f"{__name__}.mineru:MinerUAdapter",
 }
 
-KNOWN_MODELS = list(ADAPTERS.keys())
+
+class UnknownAdapter(KeyError):
+    pass
+
+
+def _parse_specs(value: str) -> Dict[str, str]:
+    specs: Dict[str, str] = {}
+    for item in value.split(","):
+        name, sep, spec = item.partition("=")
+        if sep and name.strip() and ":" in spec:
+            specs[name.strip().lower()] = spec.strip()
+        elif item.strip():
+            logger.warning("Ignoring malformed EXTRA_ADAPTERS entry %r", item)
+    return specs
+
+
+def _entry_point_specs() -> Dict[str, str]:
+    try:
+        from importlib.metadata import entry_points
+        eps = entry_points(group=ENTRY_POINT_GROUP)
+    except Exception as e:  # broken metadata should not take the app down
+        logger.warning("Could not read adapter entry points: %s", e)
+        return {}
+    return {ep.name.lower(): ep.value for ep in eps}
+
+
+def discover_adapters() -> Dict[str, str]:
+    """Built-ins, then entry points, then EXTRA_ADAPTERS; later sources win."""
+    specs = dict(_BUILTIN_ADAPTERS)
+    specs.update(_entry_point_specs())
+    specs.update(_parse_specs(os.getenv("EXTRA_ADAPTERS", "")))
+    return specs
+
+
+class AdapterRegistry:
+    """Lazily imported adapters with a small pool of warm instances per model.
+
+    `acquire` hands out an idle instance or builds a new one, so concurrent
+    requests never share an instance; at most ``pool_size`` idle instances
+    are kept per adapter. Instances are warmed with their ``warm_up()`` hook
+    when built, so the first request after `warm_up` pays no loading cost.
+    """
+
+    def __init__(self, specs: Dict[str, str], pool_size: int = 1):
+        self.specs = specs
+        self.pool_size = max(1, pool_size)
+        self._classes: Dict[str, type] = {}
+        self._idle: Dict[str, List[Any]] = {}
+        self._load_ms: Dict[str, float] = {}
+        self._loaded_by: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "AdapterRegistry":
+        return cls(discover_adapters(), pool_size=int(os.getenv("ADAPTER_POOL_SIZE", "1")))
+
+    def names(self) -> List[str]:
+        return list(self.specs)
+
+    def _class(self, name: str) -> type:
+        cls = self._classes.get(name)
+        if cls is None:
+            spec = self.specs.get(name)
+            if spec is None:
+                raise UnknownAdapter(name)
+            module_name, _, attr = spec.partition(":")
+            cls = getattr(import_module(module_name), attr)
+            self._classes[name] = cls
+        return cls
+
+    def _build(self, name: str, reason: str) -> Any:
+        start = time.perf_counter()
+        instance = self._class(name)()
+        instance.warm_up()
+        elapsed = (time.perf_counter() - start) * 1000.0
+        with self._lock:
+            if name not in self._load_ms:
+                self._load_ms[name] = round(elapsed, 2)
+                self._loaded_by[name] = reason
+        return instance
+
+    @contextmanager
+    def acquire(self, name: str) -> Iterator[Any]:
+        """Check out an adapter instance for the duration of the block."""
+        name = name.lower()
+        with self._lock:
+            idle = self._idle.get(name)
+            instance = idle.pop() if idle else None
+        if instance is None:
+            instance = self._build(name, "request")
+        try:
+            yield instance
+        finally:
+            with self._lock:
+                idle = self._idle.setdefault(name, [])
+                if len(idle) < self.pool_size:
+                    idle.append(instance)
+
+    def warm_up(self, names: Optional[List[str]] = None) -> Dict[str, float]:
+        """Import and build ``pool_size`` instances of each adapter; returns ms per adapter."""
+        timings: Dict[str, float] = {}
+        for name in names or self.names():
+            start = time.perf_counter()
+            try:
+                built = [self._build(name, "warmup") for _ in range(self.pool_size)]
+            except Exception:
+                logger.exception("Warm-up of adapter %s failed", name)
+                continue
+            with self._lock:
+                idle = self._idle.setdefault(name, [])
+                idle.extend(built[: self.pool_size - len(idle)])
+            timings[name] = round((time.perf_counter() - start) * 1000.0, 2)
+        return timings
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                name: {
+                    "loaded": name in self._classes,
+                    "idle": len(self._idle.get(name, [])),
+                    "load_ms": self._load_ms.get(name),
+                    "loaded_by": self._loaded_by.get(name),
+                }
+                for name in self.specs
+            }
+
+
+def warmup_targets() -> List[str]:
+    """Adapters named in ADAPTER_WARMUP ("all" or a comma list); empty means no warm-up."""
+    value = os.getenv("ADAPTER_WARMUP", "").strip().lower()
+    if value in ("", "0", "false", "no", "none"):
+        return []
+    if value in ("1", "true", "yes", "all"):
+        return ADAPTER_REGISTRY.names()
+    return [n.strip() for n in value.split(",") if n.strip() in ADAPTER_REGISTRY.specs]
+
+
+ADAPTER_REGISTRY = AdapterRegistry.from_env()
+
+KNOWN_MODELS = ADAPTER_REGISTRY.names()
 
 
 def get_adapter(name: str):
-    return ADAPTERS.get(name.lower(), SuryaAdapter())
+    """Build a new adapter instance owned by the caller; raises UnknownAdapter for unknown names.
+
+    The instance is not taken from or returned to the idle pool. Request
+    handling uses ``ADAPTER_REGISTRY.acquire(name)`` to reuse warm instances.
+    """
+    return ADAPTER_REGISTRY._build(name.lower(), "get_adapter")
@@ -0,0 +1,111 @@
+from __future__ import annotations
+from collections import Counter
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from .base import Rect
+from ..utils.lazy import optional_import
+
+ELEMENT_KINDS = ("titles", "headers", "paragraphs", "tables", "figures")
+
+_TITLE_RATIO = 1.6   # block font size vs. page body size
+_HEADER_RATIO = 1.15
+_BOLD = 16           # span flag bit
+_FULL_PAGE = 0.9     # image blocks covering more of the page are scans, not figures
+
+
+class PageAnalysis(NamedTuple):
+    """Everything adapters need from one page, derived from a single layout pass."""
+
+    text: str
+    blocks: List[Rect]
+    elements: Dict[str, int]
+
+
+def _empty_counts() -> Dict[str, int]:
+    return {k: 0 for k in ELEMENT_KINDS}
+
+
+def _is_table(lines: List[dict]) -> bool:
+    """Two or more rows that each hold several separate lines on one baseline."""
+    rows = Counter(round(l["bbox"][3]) for l in lines)
+    return sum(1 for n in rows.values() if n >= 2) >= 2
+
+
+def analyze_page(page) -> PageAnalysis:
+    """Run ``get_text("dict")`` once and derive text, block rects and element counts.
+
+    ``text`` matches ``get_text("text")`` and ``blocks`` the text blocks of
+    ``get_text("blocks")``. Elements are classified by font size relative to
+    the page's dominant (body) size: much larger blocks are titles, somewhat
+    larger or all-bold short blocks are headers, blocks whose lines form
+    aligned rows are tables and placed images are figures.
+    """
+    fitz = optional_import("fitz")  # already loaded: ``page`` came from it
+    # Text blocks only: keeping image blocks would decode and copy every
+    # embedded image. Figures come from `get_image_info` (placements only),
+    # which reruns the page's content stream, so only pages whose resources
+    # reference an image pay for it.
+    data = page.get_text("dict", flags=fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_IMAGES)
+    text_blocks = [b for b in data["blocks"] if b.get("type") == 0]
+
+    sizes: Counter = Counter()
+    for b in text_blocks:
+        for l in b["lines"]:
+            for s in l["spans"]:
+                sizes[round(s["size"], 1)] += len(s["text"])
+    body = sizes.most_common(1)[0][0] if sizes else 0.0
+
+    counts = _empty_counts()
+    page_area = abs(page.rect) or 1.0
+    for info in page.get_image_info() if page.get_images() else ():
+        shown = abs(fitz.Rect(info["bbox"]) & page.rect)
+        if shown and shown / page_area < _FULL_PAGE:
+            counts["figures"] += 1
+
+    text_parts: List[str] = []
+    blocks: List[Rect] = []
+    for b in text_blocks:
+        blocks.append(tuple(b["bbox"]))
+        spans = [s for l in b["lines"] for s in l["spans"]]
+        for l in b["lines"]:
+            text_parts.append("".join(s["text"] for s in l["spans"]) + "\n")
+        if not any(s["text"].strip() for s in spans):
+            continue
+        size = max(s["size"] for s in spans)
+        bold = all(s["flags"] & _BOLD for s in spans if s["text"].strip())
+        if body and size >= body * _TITLE_RATIO:
+            counts["titles"] += 1
+        elif (body and size >= body * _HEADER_RATIO) or (bold and len(b["lines"]) <= 2):
+            counts["headers"] += 1
+        elif _is_table(b["lines"]):
+            counts["tables"] += 1
+        else:
+            counts["paragraphs"] += 1
+
+    return PageAnalysis("".join(text_parts), blocks, counts)
+
+
+class DocumentAnalysis:
+    """Per-request memo of `analyze_page` results, shared by all adapters.
+
+    Each page is laid out at most once no matter how many models (or the
+    OCR check) ask for it.
+    """
+
+    def __init__(self, doc):
+        self.doc = doc
+        self._pages: Dict[int, PageAnalysis] = {}
+
+    def page(self, index: int) -> PageAnalysis:
+        result = self._pages.get(index)
+        if result is None:
+            result = analyze_page(self.doc[index])
+            self._pages[index] = result
+        return result
+
+    def text_and_blocks(self, index: int, ocr: Optional[Dict[int, Tuple[str, List[Rect]]]] = None) -> Tuple[str, List[Rect]]:
+        """Page text and block rects, using OCR output for image-only pages."""
+        if ocr and index in ocr:
+            return ocr[index]
+        result = self.page(index)
+        return result.text, list(result.blocks)
@@ -1,24 +1,64 @@
 from __future__ import annotations
-from typing import Dict, List, Tuple
-import fitz  # PyMuPDF
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    import fitz  # PyMuPDF
+    from .analysis import DocumentAnalysis
 
 Rect = Tuple[float, float, float, float]
 BlocksByPage = Dict[int, List[Rect]]
+PageSelection = Iterable[int]
+# page index -> (OCR text, word boxes in PDF points) for pages without a text layer
+OcrResults = Dict[int, Tuple[str, List[Rect]]]
+
+
+def resolve_pages(doc, max_pages: Optional[int] = None, pages: Optional[PageSelection] = None) -> List[int]:
+    """Return the page indices an adapter should process.
+
+    An explicit ``pages`` selection (range or list of 0-based indices) wins;
+    out-of-range indices are dropped. Otherwise the first ``max_pages`` pages
+    (or all of them) are used.
+    """
+    total = len(doc)
+    if pages is not None:
+        return [i for i in pages if 0 <= i < total]
+    limit = total if max_pages is None else min(total, max_pages)
+    return list(range(limit))
 
 
 class BaseAdapter:
     name: str = "base"
 
-    def extract(self, doc: fitz.Document, max_pages: int = None) -> Tuple[str, BlocksByPage]:
+    def warm_up(self) -> None:
+        """Load model weights etc. Called once per instance before first use."""
+
+    def extract(
+        self,
+        doc: fitz.Document,
+        max_pages: int = None,
+        pages: Optional[PageSelection] = None,
+        ocr: Optional[OcrResults] = None,
+        analysis: Optional["DocumentAnalysis"] = None,
+    ) -> Tuple[str, BlocksByPage]:
         """
         Extract text (as markdown string) and return layout blocks per page.
 
         Args:
             doc: The PDF document to extract from
             max_pages: Maximum number of pages to process. If None, processes all pages.
+            pages: Explicit 0-based page indices to process (overrides max_pages).
+                Pages outside the selection are never parsed.
+            ocr: OCR output for image-only pages; used in place of the (empty)
+                text layer and blocks of those pages.
+            analysis: Shared per-request page analysis. Pass the same instance
+                to every adapter so each page is laid out only once.
 
         Returns:
             text_markdown: str - the extracted text content in markdown format
             blocks_by_page: Dict[int, List[Rect]] - mapping page index -> list of block rects
         """
         raise NotImplementedError
+
+    def element_counts(self, analysis: "DocumentAnalysis", page_index: int) -> Dict[str, int]:
+        """Titles, headers, paragraphs, tables and figures found on one page."""
+        return dict(analysis.page(page_index).elements)
@@ -1,31 +1,29 @@
 from __future__ import annotations
-from typing import Dict, List, Tuple
-try:
-    import fitz
-    _HAVE_FITZ = True
-except Exception:
-    fitz = None
-    _HAVE_FITZ = False
+from typing import Dict, List, Optional, Tuple
 
-from .base import BaseAdapter, BlocksByPage
+from .analysis import DocumentAnalysis
+from .base import BaseAdapter, BlocksByPage, OcrResults, PageSelection, resolve_pages
 from ..utils.pdf import have_fitz
 
 
 class SuryaAdapter(BaseAdapter):
     name = "surya"
 
-    def extract(self, doc, max_pages: int = None) -> Tuple[str, BlocksByPage]:
+    def extract(
+        self, doc, max_pages: int = None, pages: Optional[PageSelection] = None, ocr: Optional[OcrResults] = None,
+        analysis: Optional[DocumentAnalysis] = None,
+    ) -> Tuple[str, BlocksByPage]:
         """Ultra-fast: minimal processing."""
-        pages = len(doc) if max_pages is None else min(len(doc), max_pages)
+        page_indices = resolve_pages(doc, max_pages, pages)
         md_parts: List[str] = []
         blocks: BlocksByPage = {}
         use_real = have_fitz() and getattr(doc, '__class__', None).__name__ != '_MockDoc'
+        if use_real and analysis is None:
+            analysis = DocumentAnalysis(doc)
         
-        for i in range(pages):
+        for i in page_indices:
             if use_real:
-                page = doc[i]
-                text = page.get_text("text")
-                blocks[i] = [tuple(b[:4]) for b in page.get_text("blocks")]
+                text, blocks[i] = analysis.text_and_blocks(i, ocr)
                 md_parts.append(f"# Page {i+1} (Surya)\n\n{text}\n\n")
             else:
                 blocks[i] = []
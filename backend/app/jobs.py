@@ -0,0 +1,168 @@
+from __future__ import annotations
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import asyncio
+import logging
+import os
+import time
+import uuid
+
+from .utils.serialize import dumps
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+class Job:
+    """A queued extraction: status, per-model progress and the final result."""
+
+    def __init__(self, runner: Callable[["Job"], Awaitable[Any]], models: List[str], pages: int, cancel: Optional[Callable[[], None]] = None):
+        self.id = uuid.uuid4().hex
+        self.status = "queued"  # queued -> running -> done | failed
+        self.created = time.time()
+        self.finished: Optional[float] = None
+        self.pages = pages
+        self.progress: Dict[str, int] = {m: 0 for m in models}
+        self.result: Any = None
+        self.result_bytes = 0  # size of the serialized result
+        self.error: Optional[str] = None
+        self._runner = runner
+        self._cancel = cancel
+
+    def page_done(self, model: str) -> None:
+        if model in self.progress:
+            self.progress[model] += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "status": self.status,
+            "pages": self.pages,
+            "progress": dict(self.progress),
+            "result": self.result if self.status == "done" else None,
+            "error": self.error,
+        }
+
+
+class JobQueue:
+    """Bounded in-process job queue with a fixed number of concurrent workers.
+
+    `submit` raises JobQueueFull instead of growing without limit. Finished
+    jobs are kept for ``result_ttl`` seconds so clients can collect results,
+    but at most ``max_finished`` of them and ``max_result_bytes`` of
+    serialized results; the oldest go first. A result larger than that on
+    its own is not kept and its job fails.
+    """
+
+    def __init__(
+        self,
+        max_queued: int = 16,
+        concurrency: int = 2,
+        result_ttl: int = 3600,
+        max_finished: int = 64,
+        max_result_bytes: int = 256 * 1024 * 1024,
+    ):
+        self.max_queued = max_queued
+        self.concurrency = concurrency
+        self.result_ttl = result_ttl
+        self.max_finished = max_finished
+        self.max_result_bytes = max_result_bytes
+        self._jobs: Dict[str, Job] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+
+    @classmethod
+    def from_env(cls) -> "JobQueue":
+        return cls(
+            max_queued=int(os.getenv("JOB_QUEUE_SIZE", "16")),
+            concurrency=int(os.getenv("JOB_CONCURRENCY", "2")),
+            result_ttl=int(os.getenv("JOB_RESULT_TTL_SECONDS", "3600")),
+            max_finished=int(os.getenv("JOB_MAX_FINISHED", "64")),
+            max_result_bytes=int(os.getenv("JOB_RESULT_MAX_MB", "256")) * 1024 * 1024,
+        )
+
+    def _ensure_workers(self) -> None:
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queued)
+        self._workers = [w for w in self._workers if not w.done()]
+        while len(self._workers) < self.concurrency:
+            self._workers.append(asyncio.get_running_loop().create_task(self._worker()))
+
+    def submit(self, runner: Callable[[Job], Awaitable[Any]], models: List[str], pages: int, cancel: Optional[Callable[[], None]] = None) -> Job:
+        """Queue a job; ``runner(job)`` returns its result. Call from the event loop."""
+        self._evict()
+        self._ensure_workers()
+        job = Job(runner, models, pages, cancel)
+        try:
+            self._queue.put_nowait(job)  # type: ignore[union-attr]
+        except asyncio.QueueFull:
+            raise JobQueueFull()
+        self._jobs[job.id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        self._evict()
+        return self._jobs.get(job_id)
+
+    async def _worker(self) -> None:
+        while True:
+            job: Job = await self._queue.get()  # type: ignore[union-attr]
+            job.status = "running"
+            try:
+                result = await job._runner(job)
+                size = len(dumps(result))
+                if size > self.max_result_bytes:
+                    job.status = "failed"
+                    job.error = f"Result too large to keep ({size / 1e6:.0f} MB). Use /api/extract/stream instead."
+                else:
+                    job.result, job.result_bytes = result, size
+                    job.status = "done"
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception("Job %s failed", job.id)
+                job.status = "failed"
+                job.error = str(e) or e.__class__.__name__
+            finally:
+                job.finished = time.time()
+                job._runner = None  # type: ignore[assignment]
+                job._cancel = None
+                self._queue.task_done()  # type: ignore[union-attr]
+                self._evict()
+
+    def _evict(self) -> None:
+        cutoff = time.time() - self.result_ttl
+        finished = sorted((j for j in self._jobs.values() if j.finished), key=lambda j: j.finished)
+        kept = len(finished)
+        total = sum(j.result_bytes for j in finished)
+        for job in finished:
+            if job.finished >= cutoff and kept <= self.max_finished and total <= self.max_result_bytes:
+                break
+            del self._jobs[job.id]
+            kept -= 1
+            total -= job.result_bytes
+
+    async def stop(self) -> None:
+        for w in self._workers:
+            w.cancel()
+        self._workers = []
+        # Release resources (e.g. temp uploads) held by jobs that never ran.
+        for job in self._jobs.values():
+            if job.status == "queued" and job._cancel:
+                job._cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        counts: Dict[str, int] = {}
+        for job in self._jobs.values():
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {
+            "max_queued": self.max_queued,
+            "concurrency": self.concurrency,
+            "jobs": counts,
+            "result_bytes": sum(j.result_bytes for j in self._jobs.values()),
+        }
+
+
+JOB_QUEUE = JobQueue.from_env()
@@ -1,12 +1,50 @@
+import time
+
+_IMPORT_START = time.perf_counter()
+
+import asyncio
+import logging
 import os
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from .routers.extract import router as extract_router
+from .routers.pages import router as pages_router
 from .utils.pdf import have_fitz, fitz_import_error
+from .utils.cache import RESULT_CACHE
+from .utils.compression import CompressionMiddleware
+from .utils.doccache import DOC_CACHE
+from .utils.metrics import METRICS, MetricsMiddleware
+from .utils.ratelimit import RATE_LIMITER
+from .utils.workers import pool_size, shutdown_pool
+from .jobs import JOB_QUEUE
+from .scheduler import SCHEDULER
+from .adapters import ADAPTER_REGISTRY, warmup_targets
+from .utils.lazy import import_times, warm_imports
+from .utils.ocr import ocr_enabled
+
+logger = logging.getLogger(__name__)
+
+# Time spent importing this module and everything it pulls in.
+APP_IMPORT_MS = round((time.perf_counter() - _IMPORT_START) * 1000.0, 2)
+
+
+def background_warmup_enabled() -> bool:
+    """WARMUP_BACKGROUND=1: load heavy libraries and adapters after startup, while serving."""
+    return os.getenv("WARMUP_BACKGROUND", "0").lower() in ("1", "true", "yes")
+
+
+def _warm_everything(adapters: list) -> dict:
+    """Runs in a worker thread; requests arriving meanwhile load what they need themselves."""
+    warm_imports()
+    ocr_enabled()  # imports pytesseract unless OCR is off
+    return ADAPTER_REGISTRY.warm_up(adapters) if adapters else {}
 
 
 def create_app() -> FastAPI:
+    created = time.perf_counter()
     app = FastAPI(title="PDF Extraction Playground", version="0.1.0")
+    startup = {"app_import_ms": APP_IMPORT_MS, "startup_ms": None, "warmup_ms": {}, "background_warmup": "off"}
 
     cors_origins = os.getenv("CORS_ORIGINS", "*")
     origins = [o.strip() for o in cors_origins.split(",") if o.strip()]
@@ -19,6 +57,19 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
+    if os.getenv("COMPRESSION_ENABLED", "1").lower() not in ("0", "false", "no"):
+        app.add_middleware(CompressionMiddleware, **CompressionMiddleware.options_from_env())
+
+    if METRICS.enabled:
+        app.add_middleware(MetricsMiddleware)
+
+    @app.get("/metrics", response_class=PlainTextResponse)
+    def metrics():
+        """Prometheus text format; 404 when METRICS_ENABLED=0."""
+        if not METRICS.enabled:
+            raise HTTPException(status_code=404, detail="Metrics are disabled.")
+        return PlainTextResponse(METRICS.render(), media_type="text/plain; version=0.0.4")
+
     @app.get("/health")
     def health():
         return {
@@ -26,9 +77,49 @@ def create_app() -> FastAPI:
             "pdf_engine": "fitz" if have_fitz() else "fallback",
             "fitz_available": have_fitz(),
             "fitz_error": str(fitz_import_error()) if not have_fitz() else None,
+            "result_cache": RESULT_CACHE.stats(),
+            "document_cache": DOC_CACHE.stats(),
+            "extract_workers": pool_size(),
+            "job_queue": JOB_QUEUE.stats(),
+            "rate_limiter": RATE_LIMITER.stats(),
+            "scheduler": SCHEDULER.stats(),
+            "adapters": ADAPTER_REGISTRY.stats(),
+            "startup": dict(startup, import_ms=import_times()),
         }
 
+    async def warm_up():
+        # ADAPTER_WARMUP: load adapters before serving so the first request doesn't pay for it.
+        targets = warmup_targets()
+        if targets:
+            loop = asyncio.get_running_loop()
+            startup["warmup_ms"] = await loop.run_in_executor(None, ADAPTER_REGISTRY.warm_up, targets)
+        startup["startup_ms"] = round((time.perf_counter() - created) * 1000.0, 2)
+        if background_warmup_enabled():
+            startup["background_warmup"] = "running"
+            # Keep a reference so the task is not garbage collected mid-run.
+            app.state.warmup_task = asyncio.create_task(warm_in_background())
+
+    async def warm_in_background():
+        # WARMUP_BACKGROUND: same as ADAPTER_WARMUP plus the heavy imports, without delaying startup.
+        start = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        try:
+            pending = [n for n in ADAPTER_REGISTRY.names() if n not in startup["warmup_ms"]]
+            timings = await loop.run_in_executor(None, _warm_everything, pending)
+        except Exception:
+            logger.exception("Background warm-up failed")
+            startup["background_warmup"] = "failed"
+            return
+        startup["warmup_ms"] = dict(startup["warmup_ms"], **timings)
+        startup["background_warmup_ms"] = round((time.perf_counter() - start) * 1000.0, 2)
+        startup["background_warmup"] = "done"
+
     app.include_router(extract_router, prefix="/api")
+    app.include_router(pages_router, prefix="/api")
+    app.add_event_handler("startup", warm_up)
+    app.add_event_handler("shutdown", JOB_QUEUE.stop)
+    app.add_event_handler("shutdown", shutdown_pool)
+    app.add_event_handler("shutdown", DOC_CACHE.clear)
 
     return app
 
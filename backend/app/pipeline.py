@@ -0,0 +1,571 @@
+from __future__ import annotations
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, NamedTuple, Sequence, Set, Tuple
+from concurrent.futures import Future
+import asyncio
+import base64
+import logging
+import os
+import time
+
+from .adapters import ADAPTER_REGISTRY
+from .adapters.analysis import ELEMENT_KINDS, DocumentAnalysis
+from .schemas import ElementCounts, ModelMeta
+from .utils.pdf import PdfSource, have_fitz, open_pdf, render_page_range
+from .utils.annotate import annotate_raster
+from .utils.imaging import encode_raster
+from .utils.ocr import ocr_enabled, ocr_pages
+from .utils.blobs import get_blob_store
+from .utils.cache import RESULT_CACHE, page_cache_key, pdf_digest
+from .utils.doccache import lease_pdf
+from .utils.metrics import DEGRADED_PAGES, PAGES, STAGE_SECONDS, StageTimes
+from .utils.workers import chunk_pages, get_process_pool, pool_size
+
+logger = logging.getLogger(__name__)
+
+# page index -> names of the models that still need that page
+PageWork = Dict[int, List[str]]
+# model name -> page index -> page entry. Every model entry has "markdown",
+# "block_count" and normalized "boxes" (plus "elements" counts when PyMuPDF
+# is available); raster overlays add the image as "image" (data URI) or
+# "image_id"/"image_ext" (blob store).
+# With image_mode "none" pages are not rendered at all (text and meta only).
+# Pages that did not get the full treatment list why under "degraded".
+PageEntries = Dict[str, Dict[int, dict]]
+
+IMAGE_MODES = ("inline", "url", "none")
+OVERLAY_MODES = ("raster", "vector")
+IMAGE_FORMATS = ("png", "webp", "jpeg")
+
+# Pseudo-model whose entries hold the clean page raster in vector overlay mode.
+PAGE_RASTER = "_page"
+
+# model name (or SHARED_STAGES for per-page work shared by all models) -> stage -> ms
+StageBreakdown = Dict[str, Dict[str, float]]
+SHARED_STAGES = "*"
+
+# Bump when the shape of cached page entries changes (v2: "elements", v3: "boxes" in every mode).
+_ENTRY_VERSION = "v3"
+
+# Reasons a page was degraded (listed in ModelMeta.degraded):
+# more than MAX_BOXES_PER_PAGE blocks, merged into bands
+BOXES_MERGED = "boxes_merged"
+# the page's render and layout took longer than PAGE_TIME_BUDGET_MS; the image has no boxes
+ANNOTATION_SKIPPED = "annotation_skipped"
+# Tesseract failed on the scanned page; it has no text
+OCR_FAILED = "ocr_failed"
+# the request budget ran out before the page was processed; no text, boxes or image
+TIMED_OUT = "timed_out"
+# These depend on timing, not on the document, so such entries are not cached.
+_TRANSIENT = frozenset((ANNOTATION_SKIPPED, OCR_FAILED, TIMED_OUT))
+
+_MIME = {"png": "image/png", "webp": "image/webp", "jpeg": "image/jpeg"}
+_EXT = {"png": "png", "webp": "webp", "jpeg": "jpg"}
+
+
+class RenderOptions(NamedTuple):
+    """How page images are produced; part of every result cache key."""
+
+    dpi: int = 72
+    image_mode: str = "inline"
+    overlay: str = "raster"
+    image_format: str = "png"
+    quality: int = 80  # webp/jpeg only
+
+    def cache_variant(self) -> str:
+        return f"{self.image_mode}:{self.overlay}:{self.image_format}:{self.quality}"
+
+
+# Server-side presets; request-level dpi/image_format/quality override them.
+RENDER_PRESETS: Dict[str, Dict[str, Any]] = {
+    "fast": {"dpi": 50, "image_format": "jpeg", "quality": 60},
+    "balanced": {"dpi": 72, "image_format": "webp", "quality": 80},
+    "high": {"dpi": 144, "image_format": "png", "quality": 95},
+}
+
+
+def _env_number(name: str, default: float) -> float:
+    try:
+        return max(0.0, float(os.getenv(name, str(default))))
+    except ValueError:
+        return default
+
+
+def request_time_budget() -> float | None:
+    """Seconds an interactive extraction may compute (EXTRACT_TIME_BUDGET_SECONDS, default 60; 0 = unlimited)."""
+    return _env_number("EXTRACT_TIME_BUDGET_SECONDS", 60.0) or None
+
+
+def page_time_budget_ms() -> float:
+    """Render plus layout time after which a page is not annotated (PAGE_TIME_BUDGET_MS, default 2000; 0 = unlimited)."""
+    return _env_number("PAGE_TIME_BUDGET_MS", 2000.0)
+
+
+def max_boxes_per_page() -> int:
+    """Blocks per page beyond which they are merged into bands (MAX_BOXES_PER_PAGE, default 2000; 0 = unlimited)."""
+    return int(_env_number("MAX_BOXES_PER_PAGE", 2000))
+
+
+def _expired(deadline: float | None) -> bool:
+    return deadline is not None and time.time() >= deadline
+
+
+def _encode_image(raster, opts: RenderOptions) -> dict:
+    data = encode_raster(raster, opts.image_format, opts.quality)
+    if opts.image_mode == "url":
+        ext = _EXT[opts.image_format]
+        return {"image_id": get_blob_store().put(data, ext), "image_ext": ext}
+    b64 = base64.b64encode(data).decode("ascii")
+    return {"image": f"data:{_MIME[opts.image_format]};base64,{b64}"}
+
+
+def normalized_boxes(blocks, page_rect: Tuple[float, float]) -> List[float]:
+    """Flatten block rects into ``[x0, y0, x1, y1, ...]`` as fractions of the page size."""
+    pw, ph = page_rect
+    sx = 1.0 / pw if pw else 1.0
+    sy = 1.0 / ph if ph else 1.0
+    flat: List[float] = []
+    for (x0, y0, x1, y1) in blocks:
+        flat.extend((round(x0 * sx, 4), round(y0 * sy, 4), round(x1 * sx, 4), round(y1 * sy, 4)))
+    return flat
+
+
+def merge_blocks(blocks, limit: int) -> List[Tuple[float, float, float, float]]:
+    """Merge blocks into at most ``limit`` horizontal bands (each the union of
+    consecutive blocks in top-to-bottom order)."""
+    ordered = sorted(blocks, key=lambda r: (r[1], r[0]))
+    per_band = -(-len(ordered) // limit)
+    merged = []
+    for k in range(0, len(ordered), per_band):
+        band = ordered[k:k + per_band]
+        merged.append((
+            min(r[0] for r in band), min(r[1] for r in band), max(r[2] for r in band), max(r[3] for r in band)
+        ))
+    return merged
+
+
+def timed_out_entries(work: PageWork) -> PageEntries:
+    """Placeholder entries for pages the request budget did not reach."""
+    entries: PageEntries = {}
+    for i, models in work.items():
+        for model_name in models:
+            entries.setdefault(model_name, {})[i] = {"markdown": "", "block_count": 0, "boxes": [], "degraded": [TIMED_OUT]}
+    return entries
+
+
+def process_pages(
+    doc, wanted: PageWork, opts: RenderOptions, deadline: float | None = None
+) -> Tuple[PageEntries, StageBreakdown]:
+    """Extract, annotate and encode the requested (page, model) pairs.
+
+    Each page's text layout is analyzed once up front and shared by all
+    adapters; pages without a text layer are then OCR'd in one Tesseract
+    batch and the result is shared by every model. Pages are then finished
+    one at a time: rasterized once, extracted, annotated and encoded for
+    every model that needs them. In vector overlay mode models get
+    normalized block boxes and the clean page is encoded once (as
+    `PAGE_RASTER`). Returns the per-page entries and the time spent per
+    stage: shared stages (render, analysis, ocr, page encode) under
+    `SHARED_STAGES`, and extract, annotate and encode per model.
+
+    Budgets: pages whose render and layout took longer than
+    `page_time_budget_ms` are not annotated, and pages with more than
+    `max_boxes_per_page` blocks get them merged into bands. The
+    ``deadline`` (a ``time.time()`` value) is checked before each page and
+    before OCR: finished pages are returned as they are and the rest come
+    back as `timed_out_entries`, so a chunk returns about one page after
+    the deadline. A single slow PyMuPDF call cannot be interrupted;
+    `ExtractionRun` stops waiting for such a chunk instead.
+    """
+    entries: PageEntries = {}
+    shared = StageTimes()
+    per_model: Dict[str, StageTimes] = {}
+    text_only = opts.image_mode == "none"
+    page_budget = page_time_budget_ms()
+    box_limit = max_boxes_per_page()
+    analysis = DocumentAnalysis(doc) if have_fitz() else None
+    # Layout plus render time per page, checked against the page budget.
+    page_ms: Dict[int, float] = {}
+    if analysis is not None:
+        for i in sorted(wanted):
+            if _expired(deadline):
+                break
+            start = time.perf_counter()
+            with shared.time("analysis"):
+                analysis.page(i)
+            page_ms[i] = (time.perf_counter() - start) * 1000.0
+    ocr = {}
+    ocr_failed: Set[int] = set()
+    if analysis is not None and ocr_enabled() and not _expired(deadline):
+        scanned = [
+            i for i in page_ms
+            if any(m != PAGE_RASTER for m in wanted[i]) and not analysis.page(i).text.strip()
+        ]
+        if scanned:
+            with shared.time("ocr"):
+                ocr = ocr_pages(doc, scanned)
+            ocr_failed.update(i for i in scanned if i not in ocr)
+
+    finished: Set[int] = set()
+    for i in sorted(wanted):
+        if _expired(deadline):
+            break
+        clean = None  # the unannotated page image, once encoded for a model over budget
+        start = time.perf_counter()
+        if text_only:
+            raster, page_rect = None, (doc[i].rect.width, doc[i].rect.height)
+        else:
+            with shared.time("render"):
+                raster, page_rect = render_page_range(doc, [i], dpi=opts.dpi)[i]
+        page_ms[i] = page_ms.get(i, 0.0) + (time.perf_counter() - start) * 1000.0
+        # Encode the clean page before any model draws on the shared raster.
+        models = sorted(wanted[i], key=lambda m: m != PAGE_RASTER)
+        for n, model_name in enumerate(models):
+            if model_name == PAGE_RASTER:
+                with shared.time("encode"):
+                    entries.setdefault(PAGE_RASTER, {})[i] = _encode_image(raster, opts)
+                continue
+
+            stages = per_model.setdefault(model_name, StageTimes())
+            with ADAPTER_REGISTRY.acquire(model_name) as adapter:
+                with stages.time("extract"):
+                    page_md, blocks_by_page = adapter.extract(doc, pages=[i], ocr=ocr, analysis=analysis)
+                elements = adapter.element_counts(analysis, i) if analysis is not None else None
+
+            page_blocks = blocks_by_page.get(i, [])
+            degraded = [OCR_FAILED] if i in ocr_failed else []
+            if box_limit and len(page_blocks) > box_limit:
+                page_blocks = merge_blocks(page_blocks, box_limit)
+                degraded.append(BOXES_MERGED)
+            entry = {
+                "markdown": page_md,
+                "block_count": len(page_blocks),
+                "ocr_box_count": len(ocr[i][1]) if i in ocr else 0,
+                # Kept in every mode: vector overlays send them, comparisons match them.
+                "boxes": normalized_boxes(page_blocks, page_rect),
+            }
+            if elements is not None:
+                entry["elements"] = elements
+            if opts.overlay != "vector" and raster is not None:
+                if (page_budget and page_ms[i] > page_budget) or _expired(deadline):
+                    if clean is None:
+                        with stages.time("encode"):
+                            clean = _encode_image(raster, opts)
+                    entry.update(clean)
+                    degraded.append(ANNOTATION_SKIPPED)
+                else:
+                    # The last model on a page may draw on the shared raster itself.
+                    last_user = n == len(models) - 1
+                    with stages.time("annotate"):
+                        annotated = annotate_raster(raster, page_blocks, page_rect, copy=not last_user)
+                    with stages.time("encode"):
+                        entry.update(_encode_image(annotated, opts))
+            if degraded:
+                entry["degraded"] = degraded
+            entries.setdefault(model_name, {})[i] = entry
+        finished.add(i)
+
+    skipped = {i: models for i, models in wanted.items() if i not in finished}
+    for model_name, pages in timed_out_entries(skipped).items():
+        entries.setdefault(model_name, {}).update(pages)
+    breakdown = {name: t.ms for name, t in per_model.items()}
+    breakdown[SHARED_STAGES] = shared.ms
+    return entries, breakdown
+
+
+def process_pages_from_source(
+    source: PdfSource, wanted: PageWork, opts: RenderOptions, digest: str | None = None, deadline: float | None = None
+) -> Tuple[PageEntries, StageBreakdown]:
+    """Chunk entry point: get the document and run `process_pages`.
+
+    With a ``digest`` the document is leased from this process's document
+    cache, so follow-up requests for the same file skip parsing it again.
+    Passing a file path rather than bytes keeps worker task payloads small.
+    """
+    if _expired(deadline):
+        # Queued past the deadline; the upload may already be gone.
+        return timed_out_entries(wanted), {}
+    if digest is not None:
+        with lease_pdf(digest, source) as doc:
+            return process_pages(doc, wanted, opts, deadline)
+    doc = open_pdf(source)
+    try:
+        return process_pages(doc, wanted, opts, deadline)
+    finally:
+        close = getattr(doc, "close", None)
+        if close:
+            close()
+
+
+class ModelTotals:
+    """Running per-model counters, so `ModelMeta` can be built without keeping page text."""
+
+    def __init__(self):
+        self.pages = 0
+        self.block_count = 0
+        self.char_count = 0
+        self.word_count = 0
+        self.ocr_box_count = 0
+        self.elements: Dict[str, int] = {k: 0 for k in ELEMENT_KINDS}
+        self.degraded: Dict[str, List[int]] = {}
+        self.stages = StageTimes()
+
+    def add(self, entry: dict, page_index: int) -> None:
+        md = entry["markdown"] or ""
+        if self.pages:
+            self.char_count += 2  # "\n\n" page separator
+        self.pages += 1
+        self.block_count += entry["block_count"]
+        self.ocr_box_count += entry.get("ocr_box_count", 0)
+        for kind, n in entry.get("elements", {}).items():
+            self.elements[kind] = self.elements.get(kind, 0) + n
+        self.char_count += len(md)
+        self.word_count += len(md.split())
+        for reason in entry.get("degraded", ()):
+            self.degraded.setdefault(reason, []).append(page_index + 1)
+
+    def meta(self, fitz_ok: bool) -> ModelMeta:
+        return ModelMeta(
+            time_ms=round(self.stages.ms.get("extract", 0.0), 2),
+            block_count=self.block_count,
+            ocr_box_count=self.ocr_box_count,
+            char_count=self.char_count,
+            word_count=self.word_count,
+            element_counts=ElementCounts(**self.elements),
+            confidence=None if fitz_ok else 0.2,
+            stage_ms=self.stages.as_dict() or None,
+            degraded={reason: sorted(pages) for reason, pages in self.degraded.items()} or None,
+        )
+
+
+class ExtractionRun:
+    """One document's extraction: cache lookup, chunked execution and totals.
+
+    Yields ``(model, page_index, entry)`` results; cached pages come first,
+    computed pages follow in completion order. In vector overlay mode the
+    clean page rasters are yielded under the `PAGE_RASTER` model name.
+    Fallback (no fitz) output is never cached.
+
+    With a ``time_budget`` (seconds, counted from when computing starts)
+    pages still unfinished shortly after the deadline are yielded as
+    `timed_out_entries`, so the caller gets a partial result. Chunks that
+    already started keep running until their current page ends; hand
+    anything tied to that work (the admission ticket) to `after_abandoned`.
+    """
+
+    def __init__(
+        self,
+        source: PdfSource,
+        selection: Sequence[str],
+        page_indices: Sequence[int],
+        fitz_ok: bool,
+        opts: RenderOptions = RenderOptions(),
+        digest: str | None = None,
+        cleanup: Callable[[], None] | None = None,
+        time_budget: float | None = None,
+    ):
+        self.source = source
+        self.selection = list(dict.fromkeys(selection))
+        self.page_indices = page_indices
+        self.fitz_ok = fitz_ok
+        self.opts = opts
+        self.digest = digest or pdf_digest(source)
+        self._cleanup = cleanup
+        self.time_budget = time_budget
+        self.deadline: float | None = None
+        self.totals: Dict[str, ModelTotals] = {m: ModelTotals() for m in self.selection}
+        # Request-level stages (load, render, analysis, ocr, page image encode)
+        self.stages = StageTimes()
+        self._hits: List[Tuple[str, int, dict]] = []
+        self.wanted: PageWork = {}
+        # Pool futures by their asyncio wrapper, so queued chunks can be cancelled.
+        self._submitted: Dict[asyncio.Future, Future] = {}
+        self._abandoned: Set[asyncio.Future] = set()
+        self._after_abandoned: List[Callable[[], None]] = []
+        wants_page = opts.overlay == "vector" and opts.image_mode != "none"
+        lookup = self.selection + ([PAGE_RASTER] if wants_page else [])
+        for i in page_indices:
+            for model_name in lookup:
+                entry = RESULT_CACHE.get(self._key(model_name, i)) if fitz_ok else None
+                # A cached URL entry is only usable while its blob is alive.
+                if entry is not None and "image_id" in entry and get_blob_store().path_for(entry["image_id"], entry["image_ext"]) is None:
+                    entry = None
+                if entry is None:
+                    self.wanted.setdefault(i, []).append(model_name)
+                else:
+                    self._hits.append((model_name, i, entry))
+
+    def close(self) -> None:
+        """Run the cleanup hook (e.g. delete the temp upload) once no abandoned
+        chunk can still read it; the document stays cached."""
+        if self._cleanup:
+            cleanup, self._cleanup = self._cleanup, None
+            self.after_abandoned(cleanup)
+
+    def after_abandoned(self, callback: Callable[[], None]) -> None:
+        """Call ``callback`` (on the event loop) once chunks abandoned at the
+        deadline have finished; right away if none are running."""
+        if self._abandoned:
+            self._after_abandoned.append(callback)
+        else:
+            callback()
+
+    def _abandon(self, fut: asyncio.Future) -> None:
+        """Stop waiting for a chunk. A queued pool chunk is cancelled; one that
+        already started runs to the end and its result (or error) is dropped."""
+        pending = self._submitted.pop(fut, None)
+        if pending is not None and pending.cancel():
+            return
+        self._abandoned.add(fut)
+        fut.add_done_callback(self._abandoned_done)
+
+    def _abandoned_done(self, fut: asyncio.Future) -> None:
+        fut.cancelled() or fut.exception()
+        self._abandoned.discard(fut)
+        if self._abandoned:
+            return
+        callbacks, self._after_abandoned = self._after_abandoned, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                logger.exception("Callback after abandoned chunks failed")
+
+    def stage_ms(self) -> Dict[str, float]:
+        """Request-wide time per stage: shared stages plus all models' stages."""
+        combined = StageTimes()
+        combined.merge(self.stages.ms)
+        for totals in self.totals.values():
+            combined.merge(totals.stages.ms)
+        return combined.as_dict()
+
+    def _record_metrics(self) -> None:
+        for stage, ms in self.stage_ms().items():
+            STAGE_SECONDS.observe(ms / 1000.0, stage=stage)
+        computed = len(self.wanted)
+        PAGES.inc(computed, source="computed")
+        PAGES.inc(len(self.page_indices) - computed, source="cached")
+        for totals in self.totals.values():
+            for reason, pages in totals.degraded.items():
+                DEGRADED_PAGES.inc(len(pages), reason=reason)
+
+    def cost(self) -> float:
+        """Estimated work for the uncached pages, in units of one model's text
+        extraction of one page; rendering, annotating and encoding scale with
+        (dpi / 72)^2. Cached pages are free."""
+        scale = 0.0 if self.opts.image_mode == "none" else (self.opts.dpi / 72.0) ** 2
+        total = 0.0
+        for models in self.wanted.values():
+            n = sum(1 for m in models if m != PAGE_RASTER)
+            images = 1 if self.opts.overlay == "vector" else n
+            total += n + scale * (1 + images)
+        return round(total, 1)
+
+    def _key(self, model_name: str, page_index: int) -> str:
+        variant = f"{_ENTRY_VERSION}:{self.opts.cache_variant()}:b{max_boxes_per_page()}" + (":ocr" if ocr_enabled() else "")
+        return page_cache_key(self.digest, model_name, page_index, self.opts.dpi, variant)
+
+    def _chunks(self, size: int) -> List[PageWork]:
+        items = sorted(self.wanted.items())
+        return [dict(items[k:k + size]) for k in range(0, len(items), size)]
+
+    def cached(self) -> Iterator[Tuple[str, int, dict]]:
+        for model_name, i, entry in self._hits:
+            self._count(model_name, i, entry)
+            yield model_name, i, entry
+
+    def _count(self, model_name: str, i: int, entry: dict) -> None:
+        if model_name != PAGE_RASTER:
+            self.totals[model_name].add(entry, i)
+
+    def _remaining(self) -> float | None:
+        """Seconds left to wait for chunks: the budget plus one page's worth,
+        which lets a chunk that hit the deadline report what it finished."""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline + page_time_budget_ms() / 1000.0 - time.time())
+
+    def _run_chunk(self, loop, pool, chunk: PageWork) -> asyncio.Future:
+        args = (self.source, chunk, self.opts, self.digest, self.deadline)
+        if pool is None:
+            # Threads start right away; nothing to cancel while queued.
+            return loop.run_in_executor(None, process_pages_from_source, *args)
+        pending = pool.submit(process_pages_from_source, *args)
+        fut = asyncio.wrap_future(pending, loop=loop)
+        self._submitted[fut] = pending
+        return fut
+
+    async def _pooled(self, loop, pool) -> AsyncIterator[Tuple[PageEntries, StageBreakdown]]:
+        """Chunk results in completion order, with at most `pool_size()` of
+        this run's chunks submitted at once."""
+        chunks = iter(self._chunks(chunk_pages()))
+        running: Dict[asyncio.Future, PageWork] = {}
+
+        def submit() -> None:
+            chunk = next(chunks, None)
+            if chunk is not None:
+                running[self._run_chunk(loop, pool, chunk)] = chunk
+
+        for _ in range(pool_size()):
+            submit()
+        try:
+            while running:
+                done, _ = await asyncio.wait(running, timeout=self._remaining(), return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    break
+                for fut in done:
+                    del running[fut]
+                    self._submitted.pop(fut, None)
+                    submit()
+                for fut in done:
+                    yield fut.result()
+            # Out of time: whatever is still running or queued comes back as timed out.
+            for chunk in list(running.values()) + list(chunks):
+                yield timed_out_entries(chunk), {}
+        finally:
+            for fut in running:
+                self._abandon(fut)
+
+    async def _inline(self, loop) -> AsyncIterator[Tuple[PageEntries, StageBreakdown]]:
+        chunks = iter(self._chunks(chunk_pages()))
+        for chunk in chunks:
+            fut = self._run_chunk(loop, None, chunk)
+            done, _ = await asyncio.wait({fut}, timeout=self._remaining())
+            if not done:
+                # The thread finishes its current page and then skips the rest.
+                self._abandon(fut)
+                yield timed_out_entries(chunk), {}
+                for rest in chunks:
+                    yield timed_out_entries(rest), {}
+                return
+            yield fut.result()
+
+    async def computed(self) -> AsyncIterator[Tuple[str, int, dict]]:
+        """Run the missing pages and yield them chunk by chunk as they finish.
+
+        With the process pool, up to one chunk per worker runs at a time (so
+        concurrent requests interleave in the pool's FIFO queue instead of
+        waiting behind a large document), and each worker leases the
+        document from its own cache. In-process, chunks run one at a time
+        in a thread, leasing the shared cached document. Chunks hold
+        EXTRACT_CHUNK_PAGES pages either way (so scanned pages in a chunk
+        share one OCR batch). Entries degraded for lack of time are not cached.
+        """
+        if not self.wanted:
+            self._record_metrics()
+            return
+        if self.time_budget:
+            self.deadline = time.time() + self.time_budget
+        loop = asyncio.get_running_loop()
+        pool = get_process_pool()
+        results = self._pooled(loop, pool) if pool is not None else self._inline(loop)
+        async for entries, breakdown in results:
+            for name, stages in breakdown.items():
+                target = self.stages if name == SHARED_STAGES else self.totals[name].stages
+                target.merge(stages)
+            for model_name, pages in entries.items():
+                for i, entry in sorted(pages.items()):
+                    if self.fitz_ok and not _TRANSIENT.intersection(entry.get("degraded", ())):
+                        RESULT_CACHE.put(self._key(model_name, i), entry)
+                    self._count(model_name, i, entry)
+                    yield model_name, i, entry
+        self._record_metrics()
@@ -1,60 +1,251 @@
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, StreamingResponse
+from fastapi.routing import APIRoute
+from starlette.background import BackgroundTask
+from starlette.formparsers import MultiPartException
 from typing import Dict, List
-import base64
-import io
+import asyncio
+import os
 import time
 import logging
-import asyncio
-from concurrent.futures import ThreadPoolExecutor
+import zipfile
 
-from ..schemas import ExtractResponse, ModelOutput, ModelMeta, ElementCounts
-from ..adapters import get_adapter, KNOWN_MODELS
-from ..utils.pdf import load_pdf_doc, render_page_image, have_fitz, fitz_import_error
-from ..utils.annotate import annotate_blocks
+from ..schemas import ExtractResponse
+from ..adapters import ADAPTER_REGISTRY, KNOWN_MODELS
+from ..jobs import JOB_QUEUE, Job, JobQueueFull
+from ..scheduler import SCHEDULER, SchedulerBusy, Ticket
+from ..pipeline import (
+    IMAGE_FORMATS,
+    IMAGE_MODES,
+    OCR_FAILED,
+    OVERLAY_MODES,
+    PAGE_RASTER,
+    TIMED_OUT,
+    RENDER_PRESETS,
+    ExtractionRun,
+    RenderOptions,
+    request_time_budget,
+)
+from ..utils.compare import compare_models, unflatten
+from ..utils.doccache import lease_pdf
+from ..utils.metrics import ADMISSION_REJECTED, ADMISSION_WAIT, RATE_LIMITED, UPLOAD_BYTES
+from ..utils.ratelimit import RATE_LIMITER
+from ..utils.pdf import have_fitz, fitz_import_error
+from ..utils.serialize import JoinedText, dumps, iter_json
+from ..utils.upload import SpooledPdf, SpoolingMultiPartParser, UploadTooLarge, claim_upload, spool_fileobj
+from ..utils.workers import pool_size
 
 logger = logging.getLogger(__name__)
-router = APIRouter(tags=["extract"])
-
-# Simple in-memory rate limiter (best-effort)
-_RATE: Dict[str, List[float]] = {}
-_MAX_REQ_PER_MIN = 12
-
-def _allow_request(ip: str) -> bool:
-    now = time.time()
-    window_start = now - 60.0
-    buf = _RATE.setdefault(ip, [])
-    # prune
-    while buf and buf[0] < window_start:
-        buf.pop(0)
-    if len(buf) >= _MAX_REQ_PER_MIN:
-        return False
-    buf.append(now)
-    return True
-
-MAX_FILE_BYTES = 15 * 1024 * 1024  # 15 MB
 
-@router.post("/extract", response_model=ExtractResponse)
-async def extract(
+MAX_UPLOAD_MB = int(os.getenv("MAX_UPLOAD_MB", "15"))
+MAX_FILE_BYTES = MAX_UPLOAD_MB * 1024 * 1024
+MIN_RENDER_DPI = 18
+MAX_RENDER_DPI = int(os.getenv("MAX_RENDER_DPI", "300"))
+MAX_BATCH_FILES = int(os.getenv("BATCH_MAX_FILES", "100"))
+MAX_BATCH_MB = int(os.getenv("BATCH_MAX_MB", "200"))
+MAX_BATCH_BYTES = MAX_BATCH_MB * 1024 * 1024
+# Room for form fields and multipart headers on top of the file bytes
+FORM_OVERHEAD_BYTES = 1024 * 1024
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", str(pool_size())))
+# Cap on rasterized pixels per request (sum over selected pages)
+MAX_PIXELS_PER_REQUEST = int(os.getenv("MAX_PIXELS_PER_REQUEST", str(250_000_000)))
+
+
+def _file_too_large() -> str:
+    return f"File too large. Max {MAX_UPLOAD_MB}MB."
+
+
+def _batch_too_large() -> str:
+    return f"Batch too large. Max {MAX_BATCH_MB}MB in total."
+
+
+class _UploadLimits:
+    def __init__(self, file_bytes: int, body_bytes: int, detail: str):
+        self.file_bytes = file_bytes
+        self.body_bytes = body_bytes
+        self.detail = detail
+
+
+class _SpoolingRequest(Request):
+    """Parses multipart bodies with `SpoolingMultiPartParser`, so uploads are
+    written once, to their final temp file, and limits apply as bytes arrive."""
+
+    limits: _UploadLimits
+
+    async def _get_form(self, *, max_files: int | float = 1000, max_fields: int | float = 1000):
+        if self._form is None and self.headers.get("content-type", "").startswith("multipart/form-data"):
+            parser = SpoolingMultiPartParser(
+                self.headers,
+                self.stream(),
+                max_files=max_files,
+                max_fields=max_fields,
+                max_file_bytes=self.limits.file_bytes,
+                max_body_bytes=self.limits.body_bytes,
+            )
+            try:
+                self._form = await parser.parse()
+            except MultiPartException as exc:
+                raise HTTPException(status_code=400, detail=exc.message)
+            except UploadTooLarge:
+                raise HTTPException(status_code=413, detail=self.limits.detail)
+        return await super()._get_form(max_files=max_files, max_fields=max_fields)
+
+
+class _UploadRoute(APIRoute):
+    """Rejects bodies over the route's limit from Content-Length before
+    parsing (413), and caps the rest while they are received."""
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+        if self.path.endswith("/batch"):
+            limits = _UploadLimits(MAX_BATCH_BYTES, MAX_BATCH_BYTES + FORM_OVERHEAD_BYTES, _batch_too_large())
+        else:
+            limits = _UploadLimits(MAX_FILE_BYTES, MAX_FILE_BYTES + FORM_OVERHEAD_BYTES, _file_too_large())
+
+        async def route_handler(request: Request) -> Response:
+            length = request.headers.get("content-length", "")
+            if length.isdigit() and int(length) > limits.body_bytes:
+                raise HTTPException(status_code=413, detail=limits.detail)
+            request = _SpoolingRequest(request.scope, request.receive)
+            request.limits = limits
+            return await handler(request)
+
+        return route_handler
+
+
+router = APIRouter(tags=["extract"], route_class=_UploadRoute)
+
+
+def _render_options(
+    preset: str | None,
+    dpi: int | None,
+    image_format: str | None,
+    quality: int | None,
+    image_mode: str,
+    overlay: str,
+) -> RenderOptions:
+    if image_mode not in IMAGE_MODES:
+        raise HTTPException(status_code=400, detail=f"image_mode must be one of: {', '.join(IMAGE_MODES)}")
+    if overlay not in OVERLAY_MODES:
+        raise HTTPException(status_code=400, detail=f"overlay must be one of: {', '.join(OVERLAY_MODES)}")
+    if preset is not None and preset not in RENDER_PRESETS:
+        raise HTTPException(status_code=400, detail=f"preset must be one of: {', '.join(RENDER_PRESETS)}")
+
+    fields = dict(RENDER_PRESETS[preset]) if preset else {}
+    if dpi is not None:
+        fields["dpi"] = dpi
+    if image_format is not None:
+        fields["image_format"] = image_format.lower()
+    if quality is not None:
+        fields["quality"] = quality
+    opts = RenderOptions(image_mode=image_mode, overlay=overlay, **fields)
+
+    if not MIN_RENDER_DPI <= opts.dpi <= MAX_RENDER_DPI:
+        raise HTTPException(status_code=400, detail=f"dpi must be between {MIN_RENDER_DPI} and {MAX_RENDER_DPI}")
+    if opts.image_format not in IMAGE_FORMATS:
+        raise HTTPException(status_code=400, detail=f"image_format must be one of: {', '.join(IMAGE_FORMATS)}")
+    if not 1 <= opts.quality <= 100:
+        raise HTTPException(status_code=400, detail="quality must be between 1 and 100")
+    return opts
+
+
+def _check_pixel_budget(doc, page_indices, dpi: int) -> None:
+    scale = dpi / 72.0
+    pixels = sum(doc[i].rect.width * scale * doc[i].rect.height * scale for i in page_indices)
+    if pixels > MAX_PIXELS_PER_REQUEST:
+        raise HTTPException(
+            status_code=413,
+            detail=(
+                f"Requested render is too large ({pixels / 1e6:.0f} MP > {MAX_PIXELS_PER_REQUEST / 1e6:.0f} MP). "
+                "Lower the dpi or select fewer pages."
+            ),
+        )
+
+
+def _model_selection(models: str) -> List[str]:
+    selection = [m.strip().lower() for m in models.split(",") if m.strip()]
+    if not selection:
+        return list(KNOWN_MODELS)
+    unknown = [m for m in selection if m not in ADAPTER_REGISTRY.specs]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown model(s): {', '.join(unknown)}. Available: {', '.join(ADAPTER_REGISTRY.names())}",
+        )
+    return selection
+
+
+def _client_ip(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+
+def _check_rate_limit(request: Request) -> None:
+    allowed, retry_after = RATE_LIMITER.allow(_client_ip(request), request.url.path)
+    if not allowed:
+        RATE_LIMITED.inc(route=request.url.path)
+        raise HTTPException(
+            status_code=429,
+            detail="Rate limit exceeded. Try again later.",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+async def _prepare_run(
     request: Request,
-    file: UploadFile = File(...),
-    models: str = Form("surya,docling,mineru"),
-    page_start: int | None = Form(None),
-    page_end: int | None = Form(None),
-):
-    client_ip = request.client.host if request.client else "unknown"
-    if not _allow_request(client_ip):
-        raise HTTPException(status_code=429, detail="Rate limit exceeded. Try again later.")
+    file: UploadFile,
+    models: str,
+    page_start: int | None,
+    page_end: int | None,
+    opts: RenderOptions,
+) -> ExtractionRun:
+    """Validate the upload and form fields shared by the extract endpoints.
 
+    The upload already sits in its temp file (`_UploadRoute` spooled and
+    size-checked it while it was received); the document is opened from
+    disk, or reused from the document cache when the same file was seen
+    before, and the returned run deletes the file when closed.
+    """
+    _check_rate_limit(request)
     if not file.filename or not file.filename.lower().endswith(".pdf"):
         raise HTTPException(status_code=400, detail="Please upload a PDF file.")
+    selection = _model_selection(models)
+
+    upload = claim_upload(file, MAX_FILE_BYTES)
+    UPLOAD_BYTES.inc(upload.size)
+    try:
+        return await run_in_threadpool(_open_run, upload, selection, page_start, page_end, opts)
+    except BaseException:
+        upload.close()
+        raise
 
-    pdf_bytes = await file.read()
-    if not pdf_bytes:
+
+def _open_run(
+    upload: SpooledPdf,
+    selection: List[str],
+    page_start: int | None,
+    page_end: int | None,
+    opts: RenderOptions,
+) -> ExtractionRun:
+    if not upload.size:
         raise HTTPException(status_code=400, detail="Empty file.")
-    if len(pdf_bytes) > MAX_FILE_BYTES:
-        raise HTTPException(status_code=413, detail="File too large. Max 15MB.")
 
-    doc = load_pdf_doc(pdf_bytes)
+    # Runs in a worker thread: the lease may wait for another request's chunk.
+    start = time.perf_counter()
+    with lease_pdf(upload.digest, upload.path) as doc:
+        run = _plan_run(doc, upload, selection, page_start, page_end, opts)
+    run.stages.add("load", (time.perf_counter() - start) * 1000.0)
+    return run
+
+
+def _plan_run(
+    doc,
+    upload: SpooledPdf,
+    selection: List[str],
+    page_start: int | None,
+    page_end: int | None,
+    opts: RenderOptions,
+) -> ExtractionRun:
     fitz_ok = have_fitz()
     total_pages = len(doc)
     # normalize range
@@ -68,64 +259,477 @@ async def extract(
     end_idx = (page_end - 1) if page_end else (total_pages - 1)
     pages_to_process = (end_idx - start_idx + 1)
 
-    selection = [m.strip().lower() for m in models.split(",") if m.strip()]
-    if not selection:
-        selection = KNOWN_MODELS
+    page_indices = range(start_idx, start_idx + pages_to_process)
+    if fitz_ok and opts.image_mode != "none":
+        _check_pixel_budget(doc, page_indices, opts.dpi)
+    return ExtractionRun(
+        upload.path, selection, page_indices, fitz_ok, opts,
+        digest=upload.digest, cleanup=upload.close, time_budget=request_time_budget(),
+    )
+
+
+async def _admit(request: Request, run: ExtractionRun) -> Ticket:
+    """Wait for the admission scheduler to fit the run's uncached work.
+
+    Responds 503 with Retry-After (and closes the run) when the queue is
+    saturated or the wait exceeds ADMISSION_MAX_WAIT_SECONDS.
+    """
+    start = time.perf_counter()
+    try:
+        ticket = await SCHEDULER.acquire(run.cost(), _client_ip(request))
+    except SchedulerBusy as e:
+        run.close()
+        ADMISSION_REJECTED.inc(route=request.url.path)
+        raise HTTPException(
+            status_code=503,
+            detail="Server is at capacity. Try again later.",
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    except BaseException:
+        run.close()
+        raise
+    ADMISSION_WAIT.observe(time.perf_counter() - start)
+    return ticket
+
+
+def _release(run: ExtractionRun, ticket: Ticket) -> None:
+    """Return the ticket once chunks the run stopped waiting for have finished,
+    so work still running past the deadline stays counted by the scheduler."""
+    run.after_abandoned(lambda: SCHEDULER.release(ticket))
+
 
-    outputs: Dict[str, ModelOutput] = {}
+def _image_ref(request: Request, entry: dict) -> str:
+    """Inline data URI, an absolute URL for images held in the blob store, or
+    "" for a page that timed out before it was rendered."""
+    if "image_id" in entry:
+        return str(request.url_for("get_page_image", blob_id=entry["image_id"], ext=entry["image_ext"]))
+    return entry.get("image", "")
 
-    def process_model(model_name: str):
-        adapter = get_adapter(model_name)
+
+@router.post("/extract", response_model=ExtractResponse)
+async def extract(
+    request: Request,
+    file: UploadFile = File(...),
+    models: str = Form("surya,docling,mineru"),
+    page_start: int | None = Form(None),
+    page_end: int | None = Form(None),
+    image_mode: str = Form("inline"),
+    overlay: str = Form("raster"),
+    preset: str | None = Form(None),
+    dpi: int | None = Form(None),
+    image_format: str | None = Form(None),
+    quality: int | None = Form(None),
+    compare: bool = Form(False),
+):
+    opts = _render_options(preset, dpi, image_format, quality, image_mode, overlay)
+    run = await _prepare_run(request, file, models, page_start, page_end, opts)
+    ticket = await _admit(request, run)
+    try:
+        return _json_response(await _collect(request, run, compare=compare))
+    finally:
+        _release(run, ticket)
+
+
+# Degraded reasons that leave a page without content to compare.
+_UNSCORED = frozenset({OCR_FAILED, TIMED_OUT})
+
+
+async def _collect(request: Request, run: ExtractionRun, job: Job | None = None, compare: bool = False) -> dict:
+    """Run to completion and assemble the `ExtractResponse` body; closes the run.
+
+    The body is plain data built from trusted pipeline output (no response
+    model validation), with each model's markdown kept as a `JoinedText`
+    of its pages for `iter_json`. With ``compare`` the models' pages are
+    also compared (see `compare_models`), off the event loop.
+    """
+    results: Dict[tuple, dict] = {}
+    try:
+        for model_name, i, entry in run.cached():
+            results[(model_name, i)] = entry
+            if job:
+                job.page_done(model_name)
+        async for model_name, i, entry in run.computed():
+            results[(model_name, i)] = entry
+            if job:
+                job.page_done(model_name)
+    finally:
+        run.close()
+
+    vector = run.opts.overlay == "vector"
+    images = run.opts.image_mode != "none"
+    outputs: Dict[str, dict] = {}
+    for model_name in run.selection:
+        entries = [results[(model_name, i)] for i in run.page_indices]
+        outputs[model_name] = {
+            "text_markdown": JoinedText([e["markdown"] for e in entries], "\n\n"),
+            "annotated_images": [_image_ref(request, e) for e in entries] if images and not vector else [],
+            "meta": run.totals[model_name].meta(run.fitz_ok).model_dump(),
+            "blocks": [e["boxes"] for e in entries] if vector else None,
+        }
+
+    page_images = None
+    if vector and images:
+        page_images = [_image_ref(request, results[(PAGE_RASTER, i)]) for i in run.page_indices]
+
+    comparison = None
+    if compare:
         start = time.perf_counter()
-        text_md, blocks_by_page = adapter.extract(doc)
-        elapsed_ms = (time.perf_counter() - start) * 1000.0
-
-        annotated_images: List[str] = []
-        total_blocks = 0
-        ocr_boxes = 0
-        
-        for i in range(start_idx, start_idx + pages_to_process):
-            img = render_page_image(doc, i, dpi=72)
-            page_rect = (doc[i].rect.width, doc[i].rect.height)
-            page_blocks = blocks_by_page.get(i, [])
-            total_blocks += len(page_blocks)
-            annotated = annotate_blocks(img, page_blocks, page_rect)
-
-            buf = io.BytesIO()
-            annotated.save(buf, format="PNG", optimize=True)
-            b64 = base64.b64encode(buf.getvalue()).decode("ascii")
-            annotated_images.append(f"data:image/png;base64,{b64}")
-
-        warn_confidence = None
-        if not fitz_ok:
-            warn_confidence = 0.2
-            
-        meta = ModelMeta(
-            time_ms=round(elapsed_ms, 2),
-            block_count=total_blocks,
-            ocr_box_count=ocr_boxes,
-            char_count=len(text_md or ""),
-            word_count=len((text_md or "").split()),
-            element_counts=ElementCounts(),
-            confidence=warn_confidence,
+        excluded = {
+            i
+            for i in run.page_indices
+            if any(_UNSCORED.intersection(results[(m, i)].get("degraded", ())) for m in run.selection)
+        }
+        comparison = await run_in_threadpool(
+            compare_models,
+            run.selection,
+            run.page_indices,
+            {m: {i: results[(m, i)]["markdown"] for i in run.page_indices} for m in run.selection},
+            {m: {i: unflatten(results[(m, i)]["boxes"]) for i in run.page_indices} for m in run.selection},
+            excluded,
         )
+        run.stages.add("compare", (time.perf_counter() - start) * 1000.0)
+
+    return {
+        "pages": len(run.page_indices),
+        "models": outputs,
+        "page_images": page_images,
+        "stage_ms": run.stage_ms(),
+        "comparison": comparison,
+    }
+
+
+def _json_response(body: dict) -> StreamingResponse:
+    return StreamingResponse(iter_json(body), media_type="application/json")
+
+
+@router.post("/extract/stream")
+async def extract_stream(
+    request: Request,
+    file: UploadFile = File(...),
+    models: str = Form("surya,docling,mineru"),
+    page_start: int | None = Form(None),
+    page_end: int | None = Form(None),
+    image_mode: str = Form("inline"),
+    overlay: str = Form("raster"),
+    preset: str | None = Form(None),
+    dpi: int | None = Form(None),
+    image_format: str | None = Form(None),
+    quality: int | None = Form(None),
+):
+    """Same as /extract, but streams NDJSON records as pages complete.
+
+    Emits one ``{"type": "page", model, page, markdown, image, meta}`` line
+    per (model, page) in completion order (``page`` is 1-based), then a final
+    ``{"type": "summary", pages, models: {model: ModelMeta}, stage_ms}`` line. With
+    ``overlay=vector`` page lines carry ``boxes`` instead of ``image`` and each
+    clean page arrives once as ``{"type": "page_image", page, image}``. A page
+    line's ``meta.degraded`` lists why a page was cut short, if it was.
+    """
+    opts = _render_options(preset, dpi, image_format, quality, image_mode, overlay)
+    run = await _prepare_run(request, file, models, page_start, page_end, opts)
+    ticket = await _admit(request, run)
+
+    def page_record(model_name: str, i: int, entry: dict) -> bytes:
+        if model_name == PAGE_RASTER:
+            record = {"type": "page_image", "page": i + 1, "image": _image_ref(request, entry)}
+        else:
+            record = {
+                "type": "page",
+                "model": model_name,
+                "page": i + 1,
+                "markdown": entry["markdown"],
+                "meta": {"block_count": entry["block_count"]},
+            }
+            if "degraded" in entry:
+                record["meta"]["degraded"] = entry["degraded"]
+            if run.opts.overlay == "vector":
+                record["boxes"] = entry["boxes"]
+            elif run.opts.image_mode != "none":
+                record["image"] = _image_ref(request, entry)
+        return dumps(record) + b"\n"
+
+    async def records():
+        try:
+            for model_name, i, entry in run.cached():
+                yield page_record(model_name, i, entry)
+            async for model_name, i, entry in run.computed():
+                yield page_record(model_name, i, entry)
+        except Exception as e:
+            logger.exception("Streaming extraction failed")
+            yield dumps({"type": "error", "detail": str(e)}) + b"\n"
+            return
+        finally:
+            run.close()
+            _release(run, ticket)
+        summary = {
+            "type": "summary",
+            "pages": len(run.page_indices),
+            "models": {m: run.totals[m].meta(run.fitz_ok).model_dump() for m in run.selection},
+            "stage_ms": run.stage_ms(),
+        }
+        yield dumps(summary) + b"\n"
+
+    # The background task also releases the ticket if the client disconnects
+    # before the body starts (release is idempotent).
+    return StreamingResponse(
+        records(), media_type="application/x-ndjson", background=BackgroundTask(_release, run, ticket)
+    )
+
+
+class _BatchItem:
+    """One document of a batch: its spooled upload, or why it was refused."""
+
+    def __init__(self, filename: str, upload: SpooledPdf | None = None, error: str | None = None):
+        self.filename = filename
+        self.upload = upload
+        self.error = error
+
+
+def _too_large(budget_left: int, size: int | None = None) -> str:
+    """Error for a batch file over ``min(MAX_FILE_BYTES, budget_left)`` bytes;
+    ``size`` is the file's size when known up front."""
+    if budget_left < MAX_FILE_BYTES and (size is None or size <= MAX_FILE_BYTES):
+        return _batch_too_large()
+    return _file_too_large()
+
+
+def _batch_full() -> str:
+    return f"Batch is limited to {MAX_BATCH_FILES} documents."
+
+
+def _skip_member(info: zipfile.ZipInfo) -> bool:
+    """Directories and metadata such as ``.DS_Store`` or ``__MACOSX/``."""
+    return info.is_dir() or os.path.basename(info.filename).startswith(".") or info.filename.startswith("__MACOSX/")
 
-        return model_name, ModelOutput(
-            text_markdown=text_md,
-            annotated_images=annotated_images,
-            meta=meta,
+
+def _expand_zip(archive: SpooledPdf, name: str, budget: List[int], slots: int) -> List[_BatchItem]:
+    """Spool the PDF members of a zip archive.
+
+    ``budget`` holds the batch's remaining bytes and ``slots`` how many more
+    documents it takes. Members past ``slots`` are not read at all, and
+    members whose uncompressed size is over the budget are refused before
+    anything is extracted.
+    """
+    items: List[_BatchItem] = []
+    try:
+        with zipfile.ZipFile(archive.path) as zf:
+            members = [info for info in zf.infolist() if not _skip_member(info)]
+            for info in members[:slots]:
+                member = f"{name}/{info.filename}"
+                if not info.filename.lower().endswith(".pdf"):
+                    items.append(_BatchItem(member, error="Not a PDF file."))
+                    continue
+                # file_size comes from the archive header; the copy is capped regardless.
+                if info.file_size > min(MAX_FILE_BYTES, budget[0]):
+                    items.append(_BatchItem(member, error=_too_large(budget[0], info.file_size)))
+                    continue
+                try:
+                    with zf.open(info) as fh:
+                        upload = spool_fileobj(fh, min(MAX_FILE_BYTES, budget[0]))
+                except UploadTooLarge:
+                    items.append(_BatchItem(member, error=_too_large(budget[0])))
+                    continue
+                except (zipfile.BadZipFile, RuntimeError, OSError) as e:  # corrupt or encrypted member
+                    items.append(_BatchItem(member, error=f"Unreadable archive member: {e}"))
+                    continue
+                budget[0] -= upload.size
+                items.append(_BatchItem(member, upload))
+            if len(members) > slots:
+                skipped = len(members) - slots
+                items.append(_BatchItem(name, error=f"{_batch_full()} {skipped} archive members were not read."))
+    except zipfile.BadZipFile:
+        items.append(_BatchItem(name, error="Not a valid zip archive."))
+    finally:
+        archive.close()
+    return items
+
+
+async def _spool_batch(files: List[UploadFile]) -> List[_BatchItem]:
+    items: List[_BatchItem] = []
+    budget = [MAX_BATCH_BYTES]
+    try:
+        for file in files:
+            name = file.filename or "upload"
+            lower = name.lower()
+            if lower.endswith(".zip"):
+                try:
+                    archive = claim_upload(file, MAX_BATCH_BYTES)
+                except UploadTooLarge:
+                    items.append(_BatchItem(name, error=f"Archive too large. Max {MAX_BATCH_MB}MB."))
+                    continue
+                slots = max(MAX_BATCH_FILES - len(items), 0)
+                items.extend(await run_in_threadpool(_expand_zip, archive, name, budget, slots))
+            elif len(items) >= MAX_BATCH_FILES:
+                # Left unclaimed, the upload is deleted with the form.
+                items.append(_BatchItem(name, error=_batch_full()))
+            elif lower.endswith(".pdf"):
+                try:
+                    upload = claim_upload(file, min(MAX_FILE_BYTES, budget[0]))
+                except UploadTooLarge:
+                    items.append(_BatchItem(name, error=_too_large(budget[0], file.size)))
+                    continue
+                budget[0] -= upload.size
+                items.append(_BatchItem(name, upload))
+            else:
+                items.append(_BatchItem(name, error="Not a PDF or zip file."))
+    except BaseException:
+        for item in items:
+            if item.upload:
+                item.upload.close()
+        raise
+    return items
+
+
+@router.post("/extract/batch")
+async def extract_batch(
+    request: Request,
+    files: List[UploadFile] = File(...),
+    models: str = Form("surya,docling,mineru"),
+    page_start: int | None = Form(None),
+    page_end: int | None = Form(None),
+    include_images: bool = Form(False),
+    compare: bool = Form(False),
+    image_mode: str = Form("inline"),
+    overlay: str = Form("raster"),
+    preset: str | None = Form(None),
+    dpi: int | None = Form(None),
+    image_format: str | None = Form(None),
+    quality: int | None = Form(None),
+):
+    """Extract many PDFs (and/or zip archives of PDFs) in one call, as NDJSON.
+
+    Documents run concurrently (up to BATCH_CONCURRENCY) and each one is
+    admitted by the scheduler on its own. Emits one line per document in
+    completion order: ``{"type": "document", index, filename, status: "ok",
+    pages, models, page_images, stage_ms}`` (the /extract response shape) or
+    ``{"type": "document", index, filename, status: "error", detail}``,
+    then ``{"type": "summary", documents, succeeded, failed}``. Images are
+    only rendered with ``include_images=true``. A bad file fails only its
+    own line. The whole batch counts as one request for rate limiting.
+    """
+    _check_rate_limit(request)
+    selection = _model_selection(models)
+    if not include_images:
+        image_mode = "none"
+    opts = _render_options(preset, dpi, image_format, quality, image_mode, overlay)
+    items = await _spool_batch(files)
+    for item in items:
+        if item.upload:
+            UPLOAD_BYTES.inc(item.upload.size)
+    client_ip = _client_ip(request)
+
+    async def run_one(index: int, item: _BatchItem) -> dict:
+        record = {"type": "document", "index": index, "filename": item.filename}
+        if item.error:
+            return {**record, "status": "error", "detail": item.error}
+        # item.upload stays set so _discard_batch can still delete it if this task is cancelled.
+        upload = item.upload
+        try:
+            run = await run_in_threadpool(_open_run, upload, selection, page_start, page_end, opts)
+        except HTTPException as e:
+            upload.close()
+            return {**record, "status": "error", "detail": e.detail}
+        except Exception as e:
+            upload.close()
+            logger.warning("Batch document %s could not be opened: %s", item.filename, e)
+            return {**record, "status": "error", "detail": "Could not open PDF (damaged or not a PDF)."}
+        ticket = None
+        try:
+            ticket = await SCHEDULER.acquire(run.cost(), client_ip, reject=False)
+            body = await _collect(request, run, compare=compare)
+        except Exception as e:
+            logger.exception("Batch document %s failed", item.filename)
+            return {**record, "status": "error", "detail": str(e) or e.__class__.__name__}
+        finally:
+            run.close()
+            if ticket is not None:
+                _release(run, ticket)
+        return {**record, "status": "ok", **body}
+
+    async def records():
+        limit = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+        async def bounded(index: int, item: _BatchItem) -> dict:
+            async with limit:
+                return await run_one(index, item)
+
+        tasks = [asyncio.ensure_future(bounded(k, item)) for k, item in enumerate(items)]
+        failed = 0
+        try:
+            for fut in asyncio.as_completed(tasks):
+                record = await fut
+                failed += record["status"] != "ok"
+                yield b"".join(iter_json(record)) + b"\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+            _discard_batch(items)
+        summary = {"type": "summary", "documents": len(items), "succeeded": len(items) - failed, "failed": failed}
+        yield dumps(summary) + b"\n"
+
+    # Delete spooled files even if the client disconnects before the body starts.
+    return StreamingResponse(
+        records(), media_type="application/x-ndjson", background=BackgroundTask(_discard_batch, items)
+    )
+
+
+def _discard_batch(items: List[_BatchItem]) -> None:
+    for item in items:
+        if item.upload:
+            item.upload.close()
+            item.upload = None
+
+
+@router.post("/jobs", status_code=202)
+async def create_job(
+    request: Request,
+    file: UploadFile = File(...),
+    models: str = Form("surya,docling,mineru"),
+    page_start: int | None = Form(None),
+    page_end: int | None = Form(None),
+    image_mode: str = Form("inline"),
+    overlay: str = Form("raster"),
+    preset: str | None = Form(None),
+    dpi: int | None = Form(None),
+    image_format: str | None = Form(None),
+    quality: int | None = Form(None),
+    compare: bool = Form(False),
+):
+    """Queue an extraction (same fields as /extract) and return its job id.
+
+    Poll ``GET /api/jobs/{id}`` for progress and the result. Responds 503
+    with Retry-After when the queue is full.
+    """
+    opts = _render_options(preset, dpi, image_format, quality, image_mode, overlay)
+    run = await _prepare_run(request, file, models, page_start, page_end, opts)
+    # Jobs exist for long documents: only the per-page budget applies.
+    run.time_budget = None
+
+    client_ip = _client_ip(request)
+
+    async def runner(job: Job):
+        # Accepted jobs wait for admission as long as it takes instead of being rejected.
+        try:
+            async with SCHEDULER.admit(run.cost(), client_ip, reject=False):
+                return await _collect(request, run, job, compare=compare)
+        finally:
+            run.close()
+
+    try:
+        job = JOB_QUEUE.submit(runner, run.selection, len(run.page_indices), cancel=run.close)
+    except JobQueueFull:
+        run.close()
+        raise HTTPException(
+            status_code=503,
+            detail="Job queue is full. Try again later.",
+            headers={"Retry-After": "30"},
         )
+    return {"id": job.id, "status": job.status, "url": str(request.url_for("get_job", job_id=job.id))}
+
 
-    # Process all models in parallel using ThreadPoolExecutor
-    loop = asyncio.get_event_loop()
-    with ThreadPoolExecutor(max_workers=len(selection)) as executor:
-        futures = [loop.run_in_executor(executor, process_model, model_name) for model_name in selection]
-        results = await asyncio.gather(*futures)
-        
-    for model_name, output in results:
-        outputs[model_name] = output
-
-    if not fitz_ok:
-        pass
-        
-    return ExtractResponse(pages=pages_to_process, models=outputs)
\ No newline at end of file
+@router.get("/jobs/{job_id}", name="get_job")
+def get_job(job_id: str):
+    job = JOB_QUEUE.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired.")
+    return Response(dumps(job.to_dict()), media_type="application/json")
@@ -0,0 +1,29 @@
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import FileResponse, Response
+
+from ..utils.blobs import get_blob_store
+
+router = APIRouter(tags=["pages"])
+
+
+_MEDIA_TYPES = {"png": "image/png", "webp": "image/webp", "jpg": "image/jpeg"}
+
+
+@router.get("/pages/{blob_id}.{ext}", name="get_page_image")
+def get_page_image(blob_id: str, ext: str, request: Request):
+    """Serve a page image produced with ``image_mode=url``."""
+    store = get_blob_store()
+    path = store.path_for(blob_id, ext)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Page image not found or expired.")
+
+    # Blob ids are content hashes, so the id is a strong ETag and the bytes
+    # behind a URL never change.
+    etag = f'"{blob_id}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={store.ttl_seconds}, immutable",
+    }
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type=_MEDIA_TYPES[ext], headers=headers)
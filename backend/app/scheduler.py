@@ -0,0 +1,203 @@
+from __future__ import annotations
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple
+import asyncio
+import heapq
+import itertools
+import math
+import os
+import time
+
+from .utils.workers import pool_size
+
+
+class SchedulerBusy(Exception):
+    """The admission queue is saturated (or the wait timed out); retry later."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Server busy, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class Ticket:
+    """Admitted work; pass to `CostScheduler.release` exactly once (extra calls are ignored)."""
+
+    def __init__(self, cost: float, charge: float):
+        self.cost = cost
+        self.charge = charge
+        self.started = time.monotonic()
+        self.released = False
+
+
+class _Waiter:
+    def __init__(self, tag: float, start: float, cost: float, charge: float):
+        self.tag = tag
+        self.start = start
+        self.cost = cost
+        self.charge = charge
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.cancelled = False
+
+
+class CostScheduler:
+    """Admits extractions against a global budget of estimated cost, fairly.
+
+    Cost is in work units (see `ExtractionRun.cost`). Work runs while the
+    admitted cost fits in ``budget``; one request is charged at most
+    ``max_share`` of the budget so a huge document never locks out small
+    ones. Waiting requests are ordered by start-time fair queuing per
+    client: each request's tag is its client's previous tag (or the current
+    virtual time, if later) plus its cost, and the lowest tag goes next.
+    Small requests therefore overtake large ones. A client sending many
+    requests falls behind others. Only the head of the queue may start,
+    so large requests are never starved.
+
+    New requests are rejected with `SchedulerBusy` when others are already
+    waiting and their charges plus this one's would exceed ``max_queued``,
+    or after waiting ``max_wait`` seconds. Retry-After is estimated from the
+    recent completion rate.
+    """
+
+    def __init__(self, budget: float, max_queued: float, max_wait: Optional[float] = 60.0, max_share: float = 0.5):
+        self.budget = budget
+        self.max_queued = max_queued
+        self.max_wait = max_wait
+        self.max_share = max_share
+        # Both in charge units (cost capped at max_share of the budget).
+        self._in_flight = 0.0
+        self._queued = 0.0
+        self._vtime = 0.0
+        self._client_tags: Dict[str, float] = {}
+        self._heap: List[Tuple[float, int, _Waiter]] = []
+        self._seq = itertools.count()
+        # (finish time, charge) of recent completions, for Retry-After
+        self._done: Deque[Tuple[float, float]] = deque(maxlen=256)
+        self.admitted = 0
+        self.rejected = 0
+
+    @classmethod
+    def from_env(cls) -> "CostScheduler":
+        budget = float(os.getenv("ADMISSION_BUDGET", str(64 * pool_size())))
+        max_wait = float(os.getenv("ADMISSION_MAX_WAIT_SECONDS", "60"))
+        return cls(
+            budget=budget,
+            max_queued=float(os.getenv("ADMISSION_MAX_QUEUED", str(budget * 8))),
+            max_wait=max_wait if max_wait > 0 else None,
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.budget > 0
+
+    def _fits(self, charge: float) -> bool:
+        # An idle server always admits the head, whatever its size.
+        return self._in_flight == 0 or self._in_flight + charge <= self.budget
+
+    def retry_after(self) -> int:
+        """Seconds until the current backlog should have drained, from recent throughput."""
+        now = time.monotonic()
+        recent = [(t, c) for t, c in self._done if t > now - 120.0]
+        if len(recent) >= 2 and recent[-1][0] > recent[0][0]:
+            rate = sum(c for _, c in recent) / (recent[-1][0] - recent[0][0])
+        else:
+            rate = self.budget / 5.0  # no history yet: assume a full budget drains in ~5s
+        backlog = self._queued + self._in_flight
+        return int(min(300, max(1, math.ceil(backlog / rate))))
+
+    async def acquire(self, cost: float, client: str, reject: bool = True) -> Ticket:
+        """Wait for admission. With ``reject=False`` (accepted jobs) never raise `SchedulerBusy`."""
+        charge = min(cost, self.budget * self.max_share)
+        if not self.enabled or cost <= 0:
+            return Ticket(cost, 0.0)
+        start = max(self._vtime, self._client_tags.get(client, 0.0))
+        tag = start + cost
+
+        if not self._heap and self._fits(charge):
+            self._set_tag(client, tag)
+            return self._admit(cost, charge, start)
+        # The first waiter is always accepted, so requests larger than
+        # max_queued can still queue behind a busy server.
+        if reject and self._heap and self._queued + charge > self.max_queued:
+            # Rejected attempts leave the client's tag alone, so retries are not penalized.
+            self.rejected += 1
+            raise SchedulerBusy(self.retry_after())
+
+        self._set_tag(client, tag)
+        waiter = _Waiter(tag, start, cost, charge)
+        heapq.heappush(self._heap, (tag, next(self._seq), waiter))
+        self._queued += charge
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), None if not reject else self.max_wait)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.future.done() and not waiter.future.cancelled():
+                ticket = waiter.future.result()
+                if isinstance(e, asyncio.CancelledError):
+                    self.release(ticket)
+                    raise
+                return ticket
+            waiter.cancelled = True
+            self._queued -= charge
+            self._dispatch()
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self.rejected += 1
+            raise SchedulerBusy(self.retry_after())
+        return waiter.future.result()
+
+    def _admit(self, cost: float, charge: float, start: float) -> Ticket:
+        self._in_flight += charge
+        self._vtime = max(self._vtime, start)
+        self.admitted += 1
+        return Ticket(cost, charge)
+
+    def _dispatch(self) -> None:
+        while self._heap:
+            _, _, head = self._heap[0]
+            if head.cancelled:
+                heapq.heappop(self._heap)
+                continue
+            if not self._fits(head.charge):
+                break
+            heapq.heappop(self._heap)
+            self._queued -= head.charge
+            head.future.set_result(self._admit(head.cost, head.charge, head.start))
+
+    def release(self, ticket: Ticket) -> None:
+        if ticket.released:
+            return
+        ticket.released = True
+        if ticket.charge:
+            self._in_flight = max(0.0, self._in_flight - ticket.charge)
+            self._done.append((time.monotonic(), ticket.charge))
+        self._dispatch()
+
+    @asynccontextmanager
+    async def admit(self, cost: float, client: str, reject: bool = True) -> AsyncIterator[Ticket]:
+        ticket = await self.acquire(cost, client, reject=reject)
+        try:
+            yield ticket
+        finally:
+            self.release(ticket)
+
+    def _set_tag(self, client: str, tag: float) -> None:
+        self._client_tags[client] = tag
+        self._prune_clients()
+
+    def _prune_clients(self) -> None:
+        # Clients whose last tag is behind virtual time have no advantage to keep.
+        if len(self._client_tags) > 10_000:
+            self._client_tags = {c: t for c, t in self._client_tags.items() if t > self._vtime}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "budget": self.budget,
+            "in_flight_cost": round(self._in_flight, 1),
+            "queued_cost": round(self._queued, 1),
+            "waiting": sum(1 for _, _, w in self._heap if not w.cancelled),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+        }
+
+
+SCHEDULER = CostScheduler.from_env()
@@ -18,14 +18,51 @@ class ModelMeta(BaseModel):
     word_count: int
     element_counts: ElementCounts
     confidence: Optional[float] = None
+    # ms per stage for this model's pages: extract, annotate, encode
+    stage_ms: Optional[Dict[str, float]] = None
+    # 1-based pages that were cut short, by reason: boxes_merged,
+    # annotation_skipped, ocr_failed, timed_out
+    degraded: Optional[Dict[str, List[int]]] = None
 
 
 class ModelOutput(BaseModel):
     text_markdown: str
     annotated_images: List[str]
     meta: Optional[ModelMeta] = None
+    # overlay=vector: per page, flat [x0, y0, x1, y1, ...] normalized to 0..1
+    blocks: Optional[List[List[float]]] = None
+
+
+class PageAgreement(BaseModel):
+    page: int
+    text_similarity: List[List[float]]
+    block_agreement: List[List[float]]
+
+
+class ModelComparison(BaseModel):
+    # matrices are indexed like `models`
+    models: List[str]
+    iou_threshold: float
+    # Document-level matrices; None when every page is excluded.
+    # token-level diff ratio (0..1), averaged over pages
+    text_similarity: Optional[List[List[float]]] = None
+    # 2 * matched blocks / (blocks of both models), blocks matched at IoU >= iou_threshold
+    block_agreement: Optional[List[List[float]]] = None
+    # mean IoU of the matched blocks
+    block_iou: Optional[List[List[float]]] = None
+    pages: List[PageAgreement]
+    # 1-based pages left out of every score because a model has no content
+    # for them (degraded as timed_out or ocr_failed)
+    excluded_pages: List[int] = []
 
 
 class ExtractResponse(BaseModel):
     pages: int
     models: Dict[str, ModelOutput]
+    # overlay=vector: one clean page image per page, shared by all models
+    page_images: Optional[List[str]] = None
+    # ms per stage for the whole request: load, render, analysis, ocr,
+    # extract, annotate, encode (all models together)
+    stage_ms: Optional[Dict[str, float]] = None
+    # compare=true: agreement between the selected models
+    comparison: Optional[ModelComparison] = None
@@ -1,12 +1,18 @@
 from __future__ import annotations
-from typing import Iterable, Tuple
-from PIL import Image, ImageDraw
+from typing import TYPE_CHECKING, Any, Iterable, Tuple
+
+if TYPE_CHECKING:
+    from PIL import Image
 
 Rect = Tuple[float, float, float, float]
 
+_BOX_COLOR = (220, 38, 38)
+
 
 def annotate_blocks(img: Image.Image, blocks: Iterable[Rect], page_size_points: Tuple[float, float]) -> Image.Image:
     """Draw rectangles with minimal overhead."""
+    from PIL import ImageDraw
+
     annotated = img.copy()
     draw = ImageDraw.Draw(annotated)
     pw, ph = page_size_points
@@ -14,6 +20,63 @@ def annotate_blocks(img: Image.Image, blocks: Iterable[Rect], page_size_points:
     sy = annotated.height / ph if ph else 1.0
 
     for (x0, y0, x1, y1) in blocks:
-        draw.rectangle([(x0 * sx, y0 * sy), (x1 * sx, y1 * sy)], outline=(220, 38, 38), width=1)  # width=1 instead of 2
+        draw.rectangle([(x0 * sx, y0 * sy), (x1 * sx, y1 * sy)], outline=_BOX_COLOR, width=1)  # width=1 instead of 2
+
+    return annotated
+
+
+def annotate_pixmap(pix, blocks: Iterable[Rect], page_size_points: Tuple[float, float], copy: bool = True):
+    """Draw 1px block outlines straight into a fitz.Pixmap.
+
+    With ``copy=False`` the pixmap is modified in place, which avoids
+    duplicating the page buffer for its last user.
+    """
+    import fitz  # only reached when rendering produced a pixmap
+
+    # Pixmap(pix) alone would add an alpha channel; (pix, alpha) is a plain copy.
+    annotated = fitz.Pixmap(pix, pix.alpha) if copy else pix
+    pw, ph = page_size_points
+    sx = annotated.width / pw if pw else 1.0
+    sy = annotated.height / ph if ph else 1.0
+    color = _BOX_COLOR + (255,) * (annotated.n - 3) if annotated.n >= 3 else (_BOX_COLOR[0],)
+
+    samples = annotated.samples_mv
+    if samples.readonly:
+        for (x0, y0, x1, y1) in blocks:
+            l, t, r, b = int(x0 * sx), int(y0 * sy), int(x1 * sx), int(y1 * sy)
+            annotated.set_rect(fitz.IRect(l, t, r + 1, t + 1), color)
+            annotated.set_rect(fitz.IRect(l, b, r + 1, b + 1), color)
+            annotated.set_rect(fitz.IRect(l, t, l + 1, b + 1), color)
+            annotated.set_rect(fitz.IRect(r, t, r + 1, b + 1), color)
+        return annotated
+
+    # set_rect costs a few microseconds per pixel in recent PyMuPDF builds, so
+    # write the outlines straight into the sample buffer: one slice per
+    # horizontal edge and one strided slice per channel per vertical edge.
+    w, h, n, stride = annotated.width, annotated.height, annotated.n, annotated.stride
+    for (x0, y0, x1, y1) in blocks:
+        l, t, r, b = int(x0 * sx), int(y0 * sy), int(x1 * sx), int(y1 * sy)
+        if r < 0 or b < 0 or l >= w or t >= h:
+            continue
+        cl, cr, ct, cb = max(l, 0), min(r, w - 1), max(t, 0), min(b, h - 1)
+        row = bytes(color) * (cr - cl + 1)
+        for y in (t, b):
+            if 0 <= y < h:
+                start = y * stride + cl * n
+                samples[start:start + len(row)] = row
+        for x in (l, r):
+            if 0 <= x < w:
+                for c in range(n):
+                    start = ct * stride + x * n + c
+                    samples[start:cb * stride + x * n + c + 1:stride] = bytes((color[c],)) * (cb - ct + 1)
+
+    return annotated
+
+
+def annotate_raster(raster: Any, blocks: Iterable[Rect], page_size_points: Tuple[float, float], copy: bool = True):
+    """Annotate either a PIL image (fallback renderer) or a fitz.Pixmap."""
+    from PIL import Image
 
-    return annotated
\ No newline at end of file
+    if isinstance(raster, Image.Image):
+        return annotate_blocks(raster, blocks, page_size_points)
+    return annotate_pixmap(raster, blocks, page_size_points, copy=copy)
@@ -0,0 +1,103 @@
+from __future__ import annotations
+from typing import Optional
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+_BLOB_ID_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+class BlobStore:
+    """Content-addressed directory of rendered page images with TTL eviction.
+
+    Blobs are named by the SHA-256 of their bytes, so identical images are
+    stored once and ids double as strong ETags. A blob expires ``ttl_seconds``
+    after it was last written or read. The directory is shared by all worker
+    processes.
+    """
+
+    EXTENSIONS = ("png", "webp", "jpg")
+
+    def __init__(self, root: str, ttl_seconds: int = 3600):
+        self.root = root
+        self.ttl_seconds = ttl_seconds
+        self._last_sweep = 0.0
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    @classmethod
+    def from_env(cls) -> "BlobStore":
+        root = os.getenv("BLOB_DIR") or os.path.join(tempfile.gettempdir(), "pdf-playground-blobs")
+        return cls(root, ttl_seconds=int(os.getenv("BLOB_TTL_SECONDS", "3600")))
+
+    @staticmethod
+    def is_valid_id(blob_id: str) -> bool:
+        return bool(_BLOB_ID_RE.match(blob_id))
+
+    def _path(self, blob_id: str, ext: str) -> str:
+        return os.path.join(self.root, blob_id[:2], f"{blob_id}.{ext}")
+
+    def put(self, data: bytes, ext: str = "png") -> str:
+        blob_id = hashlib.sha256(data).hexdigest()
+        path = self._path(blob_id, ext)
+        if os.path.exists(path):
+            os.utime(path)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as fh:
+                fh.write(data)
+            os.replace(tmp, path)
+        self._maybe_sweep()
+        return blob_id
+
+    def path_for(self, blob_id: str, ext: str = "png") -> Optional[str]:
+        """Return the file path of a live blob (refreshing its TTL), or None."""
+        if not self.is_valid_id(blob_id) or ext not in self.EXTENSIONS:
+            return None
+        path = self._path(blob_id, ext)
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl_seconds:
+                os.remove(path)
+                return None
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    def _maybe_sweep(self) -> None:
+        now = time.time()
+        with self._lock:
+            if now - self._last_sweep < 60:
+                return
+            self._last_sweep = now
+        cutoff = now - self.ttl_seconds
+        removed = 0
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                try:
+                    if os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                        removed += 1
+                except OSError:
+                    pass
+        if removed:
+            logger.info("Evicted %d expired page blobs", removed)
+
+
+_STORE: Optional[BlobStore] = None
+
+
+def get_blob_store() -> BlobStore:
+    """Process-wide store, created on first use (also inside worker processes)."""
+    global _STORE
+    if _STORE is None:
+        _STORE = BlobStore.from_env()
+    return _STORE
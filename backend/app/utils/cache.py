@@ -0,0 +1,184 @@
+from __future__ import annotations
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple, Union
+import hashlib
+import json
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+def pdf_digest(source: Union[bytes, str]) -> str:
+    """SHA-256 of raw PDF bytes, or of a PDF file (read in chunks) given its path."""
+    if isinstance(source, bytes):
+        return hashlib.sha256(source).hexdigest()
+    hasher = hashlib.sha256()
+    with open(source, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1024 * 1024), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def page_cache_key(digest: str, model: str, page_index: int, dpi: int, variant: str = "") -> str:
+    """Key for one model's output on one page of one document.
+
+    Keys are per page so requests with overlapping page ranges share entries.
+    ``variant`` distinguishes otherwise identical pages rendered differently.
+    """
+    return f"{digest}:{model}:{page_index}:{dpi}:{variant}"
+
+
+class ResultCache:
+    """Two-tier (memory LRU + optional disk) cache of JSON-serializable page results.
+
+    The memory tier holds at most ``max_entries`` items and ``max_bytes`` of
+    serialized JSON (entries can carry base64 images). The disk tier is used
+    when ``disk_dir`` is set; once its total size exceeds ``disk_max_bytes``
+    the least recently written files are removed.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        disk_dir: Optional[str] = None,
+        disk_max_bytes: int = 512 * 1024 * 1024,
+        max_bytes: int = 256 * 1024 * 1024,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self._mem: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._mem_sizes: Dict[str, int] = {}
+        self._mem_bytes = 0
+        self._lock = threading.Lock()
+        self._disk_bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+            self._disk_bytes = sum(e.stat().st_size for e in os.scandir(disk_dir) if e.is_file())
+
+    @classmethod
+    def from_env(cls) -> "ResultCache":
+        return cls(
+            max_entries=int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "256")),
+            max_bytes=int(os.getenv("RESULT_CACHE_MAX_MB", "256")) * 1024 * 1024,
+            disk_dir=os.getenv("RESULT_CACHE_DIR") or None,
+            disk_max_bytes=int(os.getenv("RESULT_CACHE_DISK_MAX_MB", "512")) * 1024 * 1024,
+        )
+
+    def _disk_path(self, key: str) -> str:
+        name = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.disk_dir, f"{name}.json")  # type: ignore[arg-type]
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            value = self._mem.get(key)
+            if value is not None:
+                self._mem.move_to_end(key)
+                self.hits += 1
+                return value
+        loaded = self._disk_get(key)
+        with self._lock:
+            if loaded is None:
+                self.misses += 1
+                return None
+            value, size = loaded
+            self.hits += 1
+            self.disk_hits += 1
+            self._mem_put(key, value, size)
+        return value
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        data = json.dumps(value).encode("utf-8")
+        with self._lock:
+            self._mem_put(key, value, len(data))
+        self._disk_put(key, data)
+
+    def _mem_put(self, key: str, value: Dict[str, Any], size: int) -> None:
+        self._mem_drop(key)
+        if size > self.max_bytes:
+            return  # would evict everything else and still not fit
+        self._mem[key] = value
+        self._mem_sizes[key] = size
+        self._mem_bytes += size
+        while len(self._mem) > self.max_entries or self._mem_bytes > self.max_bytes:
+            self._mem_drop(next(iter(self._mem)))
+
+    def _mem_drop(self, key: str) -> None:
+        if self._mem.pop(key, None) is not None:
+            self._mem_bytes -= self._mem_sizes.pop(key)
+
+    def _disk_get(self, key: str) -> Optional[Tuple[Dict[str, Any], int]]:
+        if not self.disk_dir:
+            return None
+        try:
+            with open(self._disk_path(key), "rb") as fh:
+                data = fh.read()
+            return json.loads(data), len(data)
+        except FileNotFoundError:
+            return None
+        except Exception as e:  # corrupt / partially written entry
+            logger.warning("Dropping unreadable cache entry: %s", e)
+            return None
+
+    def _disk_put(self, key: str, data: bytes) -> None:
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "wb") as fh:
+                fh.write(data)
+        except Exception as e:
+            logger.warning("Could not write cache entry: %s", e)
+            return
+        with self._lock:
+            try:
+                # Overwriting an entry replaces its bytes rather than adding to them.
+                old = os.path.getsize(path) if os.path.exists(path) else 0
+                os.replace(tmp, path)
+            except Exception as e:
+                logger.warning("Could not write cache entry: %s", e)
+                return
+            self._disk_bytes += len(data) - old
+            if self._disk_bytes > self.disk_max_bytes:
+                self._evict_disk()
+
+    def _evict_disk(self) -> None:
+        entries = sorted(
+            (e for e in os.scandir(self.disk_dir) if e.is_file() and e.name.endswith(".json")),
+            key=lambda e: e.stat().st_mtime,
+        )
+        total = sum(e.stat().st_size for e in entries)
+        # Trim to 90% so we don't evict again on the very next write.
+        target = int(self.disk_max_bytes * 0.9)
+        for e in entries:
+            if total <= target:
+                break
+            try:
+                size = e.stat().st_size
+                os.remove(e.path)
+                total -= size
+            except OSError:
+                pass
+        self._disk_bytes = total
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "entries": len(self._mem),
+                "bytes": self._mem_bytes,
+                "disk_enabled": bool(self.disk_dir),
+                "disk_bytes": self._disk_bytes,
+            }
+
+
+RESULT_CACHE = ResultCache.from_env()
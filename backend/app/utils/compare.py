@@ -0,0 +1,162 @@
+from __future__ import annotations
+from difflib import SequenceMatcher
+from typing import Collection, Dict, List, Sequence, Tuple
+import heapq
+import re
+
+Rect = Tuple[float, float, float, float]
+
+_TOKEN = re.compile(r"\w+")
+# Adapters start each page with "# Page N (Model)"; that line always differs.
+_PAGE_HEADING = re.compile(r"\A\s*# Page \d+ \([^)]*\)\s*")
+
+# Minimum IoU for two blocks to count as the same region.
+IOU_THRESHOLD = 0.5
+
+
+def tokens(markdown: str) -> List[str]:
+    return _TOKEN.findall(_PAGE_HEADING.sub("", markdown or "").lower())
+
+
+def text_similarity(a: Sequence[str], b: Sequence[str]) -> float:
+    """Token-level diff ratio, 2 * matched / (len(a) + len(b)); 1.0 for two empty pages."""
+    if not a and not b:
+        return 1.0
+    if a == b:
+        return 1.0
+    return SequenceMatcher(None, a, b).ratio()
+
+
+def unflatten(flat: Sequence[float]) -> List[Rect]:
+    """``[x0, y0, x1, y1, ...]`` (an entry's normalized ``boxes``) back into rects."""
+    return [tuple(flat[k:k + 4]) for k in range(0, len(flat) - 3, 4)]  # type: ignore[misc]
+
+
+def _iou(a: Rect, b: Rect) -> float:
+    w = min(a[2], b[2]) - max(a[0], b[0])
+    h = min(a[3], b[3]) - max(a[1], b[1])
+    if w <= 0 or h <= 0:
+        return 0.0
+    inter = w * h
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+def overlapping_pairs(a: Sequence[Rect], b: Sequence[Rect]) -> List[Tuple[float, int, int]]:
+    """``(iou, i, j)`` for every pair of boxes from ``a`` and ``b`` that overlap.
+
+    Sort-and-sweep: boxes are visited by their leading edge, and each one
+    is only tested against the other set's boxes whose span on the sweep
+    axis is still open (expired ones leave a heap keyed by trailing edge).
+    The sweep runs along whichever axis the boxes are thinner on, which is
+    y for text lines spanning the page. The cost grows with the number of
+    boxes plus the pairs that share a span, not with len(a) * len(b).
+    """
+    width = sum(r[2] - r[0] for r in a) + sum(r[2] - r[0] for r in b)
+    height = sum(r[3] - r[1] for r in a) + sum(r[3] - r[1] for r in b)
+    if height < width:
+        # Sweep along y by transposing; IoU is the same either way.
+        a = [(r[1], r[0], r[3], r[2]) for r in a]
+        b = [(r[1], r[0], r[3], r[2]) for r in b]
+    events = sorted(
+        [(r[0], 0, i) for i, r in enumerate(a)] + [(r[0], 1, j) for j, r in enumerate(b)]
+    )
+    boxes = (a, b)
+    active: Tuple[Dict[int, Rect], Dict[int, Rect]] = ({}, {})
+    ends: Tuple[List[Tuple[float, int]], List[Tuple[float, int]]] = ([], [])
+    pairs: List[Tuple[float, int, int]] = []
+    for x0, side, idx in events:
+        other = 1 - side
+        while ends[other] and ends[other][0][0] < x0:
+            _, gone = heapq.heappop(ends[other])
+            active[other].pop(gone, None)
+        rect = boxes[side][idx]
+        for jdx, cand in active[other].items():
+            if cand[1] < rect[3] and rect[1] < cand[3]:
+                iou = _iou(rect, cand)
+                if iou > 0:
+                    pairs.append((iou, idx, jdx) if side == 0 else (iou, jdx, idx))
+        active[side][idx] = rect
+        heapq.heappush(ends[side], (rect[2], idx))
+    return pairs
+
+
+def match_blocks(a: Sequence[Rect], b: Sequence[Rect], threshold: float = IOU_THRESHOLD) -> Tuple[int, float]:
+    """Greedy one-to-one matching by descending IoU; returns (matches, summed IoU of matches)."""
+    used_a, used_b = set(), set()
+    matched, total = 0, 0.0
+    for iou, i, j in sorted(overlapping_pairs(a, b), reverse=True):
+        if iou < threshold:
+            break
+        if i in used_a or j in used_b:
+            continue
+        used_a.add(i)
+        used_b.add(j)
+        matched += 1
+        total += iou
+    return matched, total
+
+
+def _matrix(n: int) -> List[List[float]]:
+    return [[1.0] * n for _ in range(n)]
+
+
+def compare_models(
+    models: Sequence[str],
+    pages: Sequence[int],
+    markdown: Dict[str, Dict[int, str]],
+    boxes: Dict[str, Dict[int, List[Rect]]],
+    excluded: Collection[int] = (),
+) -> dict:
+    """Pairwise agreement between models, per page and over the document.
+
+    ``text_similarity`` is the token diff ratio. ``block_agreement`` is
+    2 * matched / (blocks in a + blocks in b), with blocks matched one to one
+    at IoU >= `IOU_THRESHOLD`. ``block_iou`` is the mean IoU of the matched
+    blocks. Matrices are indexed like ``models``; document-level values
+    pool all pages (the text ratio is averaged over pages).
+
+    ``excluded`` pages (e.g. ones a model never extracted) are left out of
+    every score and listed under ``excluded_pages``; two empty pages would
+    otherwise count as full agreement. With no page left to score, the
+    document-level matrices are None.
+    """
+    excluded_pages = [i + 1 for i in pages if i in excluded]
+    pages = [i for i in pages if i not in excluded]
+    n = len(models)
+    toks = {m: {i: tokens(markdown[m][i]) for i in pages} for m in models}
+    doc_text, doc_agree, doc_iou = _matrix(n), _matrix(n), _matrix(n)
+    per_page = []
+    sums: Dict[Tuple[int, int], List[float]] = {}  # pair -> [text sum, matched, blocks, iou sum]
+    for i in pages:
+        text, agree = _matrix(n), _matrix(n)
+        for x in range(n):
+            for y in range(x + 1, n):
+                ma, mb = models[x], models[y]
+                ratio = text_similarity(toks[ma][i], toks[mb][i])
+                ba, bb = boxes[ma][i], boxes[mb][i]
+                matched, iou_sum = match_blocks(ba, bb)
+                count = len(ba) + len(bb)
+                score = 2 * matched / count if count else 1.0
+                text[x][y] = text[y][x] = round(ratio, 4)
+                agree[x][y] = agree[y][x] = round(score, 4)
+                acc = sums.setdefault((x, y), [0.0, 0, 0, 0.0])
+                acc[0] += ratio
+                acc[1] += matched
+                acc[2] += count
+                acc[3] += iou_sum
+        per_page.append({"page": i + 1, "text_similarity": text, "block_agreement": agree})
+    for (x, y), (ratio_sum, matched, count, iou_sum) in sums.items():
+        doc_text[x][y] = doc_text[y][x] = round(ratio_sum / len(pages), 4) if pages else 1.0
+        doc_agree[x][y] = doc_agree[y][x] = round(2 * matched / count, 4) if count else 1.0
+        doc_iou[x][y] = doc_iou[y][x] = round(iou_sum / matched, 4) if matched else 0.0
+    scored = bool(pages)
+    return {
+        "models": list(models),
+        "iou_threshold": IOU_THRESHOLD,
+        "text_similarity": doc_text if scored else None,
+        "block_agreement": doc_agree if scored else None,
+        "block_iou": doc_iou if scored else None,
+        "pages": per_page,
+        "excluded_pages": excluded_pages,
+    }
@@ -0,0 +1,154 @@
+from __future__ import annotations
+from typing import Dict, List, Optional, Tuple
+import os
+import zlib
+
+import anyio
+
+try:
+    import brotli  # type: ignore
+    _HAVE_BROTLI = True
+except Exception:  # pragma: no cover
+    brotli = None  # type: ignore
+    _HAVE_BROTLI = False
+
+# Page images are already compressed; only text-like bodies are worth it.
+_COMPRESSIBLE = ("application/json", "application/x-ndjson", "text/")
+# Body chunks at least this large are compressed in a worker thread.
+_THREAD_BYTES = 32 * 1024
+# Streamed records are flushed one by one so clients see them promptly.
+_STREAMING = ("application/x-ndjson",)
+
+
+def available_encodings() -> List[str]:
+    return (["br"] if _HAVE_BROTLI else []) + ["gzip"]
+
+
+def negotiate(accept_encoding: str, offered: List[str]) -> Optional[str]:
+    """Pick the first of ``offered`` the client accepts (q > 0), honouring ``*``."""
+    accepted: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if name:
+            accepted[name.strip().lower()] = q
+    for encoding in offered:
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+class _Gzip:
+    def __init__(self, level: int):
+        self._z = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, flush: bool) -> bytes:
+        out = self._z.compress(data)
+        return out + self._z.flush(zlib.Z_SYNC_FLUSH) if flush else out
+
+    def finish(self) -> bytes:
+        return self._z.flush(zlib.Z_FINISH)
+
+
+class _Brotli:
+    def __init__(self, quality: int):
+        self._c = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes, flush: bool) -> bytes:
+        out = self._c.process(data)
+        return out + self._c.flush() if flush else out
+
+    def finish(self) -> bytes:
+        return self._c.finish()
+
+
+class CompressionMiddleware:
+    """ASGI middleware: gzip or brotli response bodies per ``Accept-Encoding``.
+
+    Only JSON, NDJSON and text responses of at least ``min_bytes`` are
+    compressed (a streamed body whose size is unknown always is). Brotli
+    is offered when the ``brotli`` package is installed. NDJSON is flushed
+    after every chunk, so streamed records are not held back.
+    """
+
+    def __init__(self, app, min_bytes: int = 1024, gzip_level: int = 5, brotli_quality: int = 4):
+        self.app = app
+        self.min_bytes = min_bytes
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    @classmethod
+    def options_from_env(cls) -> Dict[str, int]:
+        return {
+            "min_bytes": int(os.getenv("COMPRESSION_MIN_BYTES", "1024")),
+            "gzip_level": int(os.getenv("COMPRESSION_GZIP_LEVEL", "5")),
+            "brotli_quality": int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4")),
+        }
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept = ""
+        for key, value in scope.get("headers", []):
+            if key == b"accept-encoding":
+                accept = value.decode("latin-1")
+        encoding = negotiate(accept, available_encodings()) if accept else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[dict] = None
+        compressor = None
+        streaming = False
+
+        async def send_wrapper(message):
+            nonlocal start, compressor, streaming
+            if message["type"] == "http.response.start":
+                start = message  # held until the first body chunk shows the size
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+            body, more = message.get("body", b""), message.get("more_body", False)
+            if start is not None:
+                headers: List[Tuple[bytes, bytes]] = list(start.get("headers", []))
+                names = {k.lower(): v for k, v in headers}
+                ctype = names.get(b"content-type", b"").decode("latin-1")
+                wanted = (
+                    b"content-encoding" not in names
+                    and ctype.startswith(_COMPRESSIBLE)
+                    and (more or len(body) >= self.min_bytes)
+                )
+                if wanted:
+                    compressor = _Brotli(self.brotli_quality) if encoding == "br" else _Gzip(self.gzip_level)
+                    streaming = ctype.startswith(_STREAMING)
+                    headers = [(k, v) for k, v in headers if k.lower() != b"content-length"]
+                    headers.append((b"content-encoding", encoding.encode("latin-1")))
+                    headers.append((b"vary", b"Accept-Encoding"))
+                    start = dict(start, headers=headers)
+                await send(start)
+                start = None
+            if compressor is None:
+                await send(message)
+                return
+            if len(body) >= _THREAD_BYTES:
+                # Compressing base64 images runs at ~25 MB/s; keep it off the event loop.
+                data = await anyio.to_thread.run_sync(compressor.compress, body, streaming and more)
+            else:
+                data = compressor.compress(body, flush=streaming and more)
+            if not more:
+                data += compressor.finish()
+            if data or not more:
+                await send({"type": "http.response.body", "body": data, "more_body": more})
+
+        await self.app(scope, receive, send_wrapper)
+        if start is not None:  # no body was sent at all
+            await send(start)
@@ -0,0 +1,156 @@
+from __future__ import annotations
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, ContextManager, Dict, Iterator
+import logging
+import os
+import threading
+
+from .pdf import PdfSource, load_pdf_doc, open_pdf
+
+logger = logging.getLogger(__name__)
+
+
+class _Entry:
+    def __init__(self, doc: Any, size: int):
+        self.doc = doc
+        self.size = size
+        self.users = 0
+        self.evicted = False
+        # PyMuPDF documents must not be used from two threads at once.
+        self.lock = threading.Lock()
+
+
+def _close(doc: Any) -> None:
+    close = getattr(doc, "close", None)
+    if close:
+        try:
+            close()
+        except Exception as e:
+            logger.warning("Error closing cached document: %s", e)
+
+
+class DocumentCache:
+    """LRU cache of opened documents keyed by content digest.
+
+    Follow-up requests for the same file (other page ranges or models) reuse
+    the parsed xref, page tree and fonts instead of reopening the PDF. Each
+    entry is charged its file size; the least recently used documents are
+    closed once more than ``max_docs`` are open or their total size exceeds
+    ``max_bytes``. A document evicted while leased is closed when its last
+    lease ends. ``max_docs=0`` disables caching.
+    """
+
+    def __init__(self, max_docs: int = 8, max_bytes: int = 256 * 1024 * 1024):
+        self.max_docs = max_docs
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls) -> "DocumentCache":
+        return cls(
+            max_docs=int(os.getenv("DOC_CACHE_MAX_DOCS", "8")),
+            max_bytes=int(os.getenv("DOC_CACHE_MAX_MB", "256")) * 1024 * 1024,
+        )
+
+    @contextmanager
+    def lease(self, digest: str, opener: Callable[[], Any], size: int) -> Iterator[Any]:
+        """Yield the open document for ``digest``, calling ``opener()`` on a miss.
+
+        The document is exclusively held by the caller for the duration of
+        the block; concurrent leases of the same document wait for it.
+        """
+        if self.max_docs <= 0 or size > self.max_bytes:
+            doc = opener()
+            try:
+                yield doc
+            finally:
+                _close(doc)
+            return
+
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is not None:
+                self._entries.move_to_end(digest)
+                entry.users += 1
+                self.hits += 1
+        if entry is None:
+            doc = opener()
+            with self._lock:
+                self.misses += 1
+                entry = self._entries.get(digest)
+                if entry is None:
+                    entry = _Entry(doc, size)
+                    self._entries[digest] = entry
+                    self._bytes += size
+                    doc = None
+                entry.users += 1
+                evicted = self._evict()
+            if doc is not None:  # another request opened it first
+                _close(doc)
+            for old in evicted:
+                _close(old.doc)
+
+        try:
+            with entry.lock:
+                yield entry.doc
+        finally:
+            with self._lock:
+                entry.users -= 1
+                close_now = entry.evicted and entry.users == 0
+            if close_now:
+                _close(entry.doc)
+
+    def _evict(self) -> list:
+        """Drop LRU entries over budget; returns entries that can be closed now. Call with the lock held."""
+        closable = []
+        while self._entries and (len(self._entries) > self.max_docs or self._bytes > self.max_bytes):
+            _, old = self._entries.popitem(last=False)
+            self._bytes -= old.size
+            old.evicted = True
+            if old.users == 0:
+                closable.append(old)
+        return closable
+
+    def clear(self) -> None:
+        with self._lock:
+            entries = list(self._entries.values())
+            self._entries.clear()
+            self._bytes = 0
+            for e in entries:
+                e.evicted = True
+            closable = [e for e in entries if e.users == 0]
+        for e in closable:
+            _close(e.doc)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "documents": len(self._entries),
+                "bytes": self._bytes,
+                "max_documents": self.max_docs,
+                "max_bytes": self.max_bytes,
+            }
+
+
+DOC_CACHE = DocumentCache.from_env()
+
+
+def lease_pdf(digest: str, source: PdfSource) -> ContextManager[Any]:
+    """Lease the document for ``digest`` from `DOC_CACHE`, opening ``source`` on a miss."""
+    size = len(source) if isinstance(source, bytes) else os.path.getsize(source)
+
+    def opener():
+        if isinstance(source, str) and os.name == "nt":
+            # Windows cannot delete the temp upload while MuPDF holds it open.
+            with open(source, "rb") as fh:
+                return load_pdf_doc(fh.read())
+        return open_pdf(source)
+
+    return DOC_CACHE.lease(digest, opener, size)
@@ -0,0 +1,31 @@
+from __future__ import annotations
+from typing import Any
+import io
+
+from .pdf import pixmap_to_image
+
+# Formats PyMuPDF can encode straight from a pixmap buffer
+_PIXMAP_FORMATS = {"png": "png", "jpeg": "jpg"}
+
+
+def encode_raster(raster: Any, image_format: str = "png", quality: int = 80) -> bytes:
+    """Encode a PIL image or fitz.Pixmap as PNG/WebP/JPEG bytes.
+
+    Pixmaps are encoded directly with ``pix.tobytes()`` where PyMuPDF supports
+    the format; otherwise they are wrapped (without copying) for Pillow.
+    """
+    from PIL import Image
+
+    if not isinstance(raster, Image.Image):
+        if image_format in _PIXMAP_FORMATS:
+            return raster.tobytes(_PIXMAP_FORMATS[image_format], jpg_quality=quality)
+        raster = pixmap_to_image(raster)
+
+    buf = io.BytesIO()
+    if image_format == "webp":
+        raster.save(buf, format="WEBP", quality=quality, method=4)
+    elif image_format == "jpeg":
+        raster.convert("RGB").save(buf, format="JPEG", quality=quality)
+    else:
+        raster.save(buf, format="PNG", optimize=True)
+    return buf.getvalue()
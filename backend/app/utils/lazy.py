@@ -0,0 +1,51 @@
+from __future__ import annotations
+from types import ModuleType
+from typing import Dict, Optional
+import importlib
+import threading
+import time
+
+_MODULES: Dict[str, Optional[ModuleType]] = {}
+_ERRORS: Dict[str, BaseException] = {}
+_IMPORT_MS: Dict[str, float] = {}
+_LOCK = threading.RLock()
+
+# Imported by the pipeline on first use; `warm_imports` loads them early.
+HEAVY_MODULES = ("fitz", "PIL.Image", "PIL.ImageDraw")
+
+
+def optional_import(name: str) -> Optional[ModuleType]:
+    """Import ``name`` on first use and remember it; None if it cannot be imported.
+
+    Import failures of any kind (e.g. a broken native library) are kept for
+    `import_error`. How long each import took is kept for `import_times`.
+    """
+    try:
+        return _MODULES[name]
+    except KeyError:
+        pass
+    with _LOCK:
+        if name not in _MODULES:
+            start = time.perf_counter()
+            try:
+                _MODULES[name] = importlib.import_module(name)
+            except Exception as e:  # broad: DLL load errors etc.
+                _MODULES[name] = None
+                _ERRORS[name] = e
+            _IMPORT_MS[name] = round((time.perf_counter() - start) * 1000.0, 2)
+    return _MODULES[name]
+
+
+def import_error(name: str) -> Optional[BaseException]:
+    return _ERRORS.get(name)
+
+
+def import_times() -> Dict[str, float]:
+    """Milliseconds spent importing each deferred module so far (0 if already loaded elsewhere)."""
+    return dict(_IMPORT_MS)
+
+
+def warm_imports() -> Dict[str, float]:
+    for name in HEAVY_MODULES:
+        optional_import(name)
+    return import_times()
@@ -1,29 +1,51 @@
 from __future__ import annotations
-from typing import Iterable, List, Tuple
-from PIL import Image
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+
+from .lazy import optional_import
+
+if TYPE_CHECKING:
+    from PIL import Image
 
 Rect = Tuple[float, float, float, float]
 
-try:
-    import pytesseract  # type: ignore
-    _HAVE_TESS = True
-except Exception:
-    pytesseract = None  # type: ignore
-    _HAVE_TESS = False
+logger = logging.getLogger(__name__)
 
 
-def ocr_image_to_text_and_boxes(img: Image.Image) -> Tuple[str, List[Rect]]:
-    """
-    Runs OCR on a PIL image and returns (text, boxes in PIXEL coords).
-    If Tesseract or pytesseract is unavailable, returns ("", []).
-    """
-    if not _HAVE_TESS:
-        return "", []
-    try:
-        data = pytesseract.image_to_data(img, output_type=pytesseract.Output.DICT)  # type: ignore[attr-defined]
-    except Exception:
-        return "", []
+# pytesseract (which pulls in NumPy and Pillow) is only imported once OCR is needed.
+def _tess():
+    return optional_import("pytesseract")
+
+
+def _np():
+    return optional_import("numpy")
+
+
+_HAVE_BINARY: Optional[bool] = None
+
 
+def _tesseract_binary() -> bool:
+    """Whether the ``tesseract`` executable pytesseract calls exists (probed once)."""
+    global _HAVE_BINARY
+    if _HAVE_BINARY is None:
+        pytesseract = _tess()
+        _HAVE_BINARY = pytesseract is not None and shutil.which(pytesseract.pytesseract.tesseract_cmd) is not None
+        if pytesseract is not None and not _HAVE_BINARY:
+            logger.warning("pytesseract is installed but the tesseract binary was not found; OCR is off")
+    return _HAVE_BINARY
+
+# Tesseract TSV columns: level page_num block_num par_num line_num word_num
+# left top width height conf text
+_TSV_NUMERIC_COLS = 11
+_COL_PAGE, _COL_LEFT, _COL_TOP, _COL_WIDTH, _COL_HEIGHT, _COL_CONF = 1, 6, 7, 8, 9, 10
+
+
+def _parse_data_dict(data) -> Tuple[str, List[Rect]]:
+    """Word-by-word parse of ``image_to_data(..., output_type=DICT)`` output."""
     n = len(data.get("level", []))
     words: List[str] = []
     boxes: List[Rect] = []
@@ -46,4 +68,157 @@ def ocr_image_to_text_and_boxes(img: Image.Image) -> Tuple[str, List[Rect]]:
         boxes.append((float(x), float(y), float(x + w), float(y + h)))
 
     text_out = " ".join(words)
-    return text_out, boxes
\ No newline at end of file
+    return text_out, boxes
+
+
+def parse_tsv(tsv: bytes, min_conf: float = 0.0) -> Dict[int, Tuple[str, List[Rect]]]:
+    """Parse raw Tesseract TSV in bulk into ``{page_num: (text, pixel boxes)}``.
+
+    The numeric columns are read by NumPy's C ``loadtxt`` parser in one call
+    and filtered with array masks. Only the rows that survive (words with
+    ``conf >= min_conf``) have their text column sliced out in Python.
+    ``page_num`` is 1-based, as in Tesseract's output for multi-image input.
+    """
+    np = _np()
+    lines = tsv.decode("utf-8", "replace").splitlines()[1:]
+    if not lines:
+        return {}
+    nums = np.loadtxt(
+        lines, delimiter="\t", usecols=range(_TSV_NUMERIC_COLS), dtype=np.float64, comments=None, ndmin=2
+    )
+    keep = np.flatnonzero(nums[:, _COL_CONF] >= min_conf)
+    texts = [lines[k].rpartition("\t")[2].strip() for k in keep.tolist()]
+    has_text = np.fromiter((bool(t) for t in texts), dtype=bool, count=len(texts))
+    nums = nums[keep[has_text]]
+    texts = [t for t in texts if t]
+    if not texts:
+        # Blank scans or only low-confidence noise; callers treat missing pages as "".
+        return {}
+
+    left, top = nums[:, _COL_LEFT], nums[:, _COL_TOP]
+    boxes = np.stack([left, top, left + nums[:, _COL_WIDTH], top + nums[:, _COL_HEIGHT]], axis=1).tolist()
+    pages = nums[:, _COL_PAGE].astype(np.int64)
+    # Tesseract writes each page's rows together: one slice per run of equal page_num.
+    cuts = [0] + (np.flatnonzero(np.diff(pages)) + 1).tolist() + [len(texts)]
+
+    out: Dict[int, Tuple[str, List[Rect]]] = {}
+    for a, b in zip(cuts, cuts[1:]):
+        text, page_boxes = out.get(int(pages[a]), ("", []))
+        joined = " ".join(texts[a:b])
+        out[int(pages[a])] = (f"{text} {joined}" if text else joined, page_boxes + [tuple(r) for r in boxes[a:b]])
+    return out
+
+
+def ocr_image_to_text_and_boxes(img: Image.Image) -> Optional[Tuple[str, List[Rect]]]:
+    """
+    Runs OCR on a PIL image and returns (text, boxes in PIXEL coords).
+    Returns None if Tesseract is unavailable or fails, so a failure is never
+    mistaken for a blank page.
+    """
+    pytesseract = _tess()
+    if pytesseract is None:
+        return None
+    try:
+        if _np() is not None:
+            tsv = pytesseract.image_to_data(img, output_type=pytesseract.Output.BYTES)  # type: ignore[attr-defined]
+            return parse_tsv(tsv).get(1, ("", []))
+        data = pytesseract.image_to_data(img, output_type=pytesseract.Output.DICT)  # type: ignore[attr-defined]
+    except Exception as e:
+        logger.warning("Tesseract failed: %s", e)
+        return None
+    return _parse_data_dict(data)
+
+
+def ocr_image_files(paths: List[str]) -> Optional[List[Tuple[str, List[Rect]]]]:
+    """OCR several image files with a single Tesseract process.
+
+    Tesseract accepts a text file listing input images and reports each one
+    as a separate ``page_num``, so process startup and model loading are paid
+    once per batch instead of once per page. Falls back to one call per image
+    without NumPy. Boxes are in pixel coordinates of each image. Returns None
+    if Tesseract is unavailable or fails.
+    """
+    pytesseract = _tess()
+    if pytesseract is None:
+        return None
+    if not paths:
+        return []
+    if _np() is None:
+        from PIL import Image
+
+        results = [ocr_image_to_text_and_boxes(Image.open(p)) for p in paths]
+        return None if any(r is None for r in results) else results  # type: ignore[return-value]
+
+    fd, list_path = tempfile.mkstemp(suffix=".txt", prefix="ocr-batch-")
+    try:
+        with os.fdopen(fd, "w") as fh:
+            fh.write("\n".join(paths) + "\n")
+        tsv = pytesseract.image_to_data(list_path, output_type=pytesseract.Output.BYTES)  # type: ignore[attr-defined]
+        by_page = parse_tsv(tsv)
+    except Exception as e:
+        logger.warning("Tesseract failed on a batch of %d images: %s", len(paths), e)
+        return None
+    finally:
+        os.remove(list_path)
+    return [by_page.get(n + 1, ("", [])) for n in range(len(paths))]
+
+
+def ocr_enabled() -> bool:
+    """OCR runs when OCR_ENABLED is not turned off, pytesseract is importable
+    and the ``tesseract`` binary exists."""
+    return os.getenv("OCR_ENABLED", "1").lower() not in ("0", "false", "no") and _tesseract_binary()
+
+
+def ocr_pages(doc, page_indices: Iterable[int], dpi: Optional[int] = None) -> Dict[int, Tuple[str, List[Rect]]]:
+    """OCR pages and return ``{page_index: (text, word boxes in PDF points)}``.
+
+    Pages are rendered at OCR_DPI (default 200). Results are cached by a hash
+    of the rendered pixels, so the same scan is only OCR'd once even across
+    documents; the remaining pages go to Tesseract in one batch. If that
+    batch fails, its pages are left out of the result and nothing is cached.
+    """
+    from PIL import Image
+    from .cache import RESULT_CACHE
+    from .pdf import render_page_raster
+
+    dpi = dpi or int(os.getenv("OCR_DPI", "200"))
+    results: Dict[int, dict] = {}
+    sizes: Dict[int, Tuple[int, int]] = {}
+    pending: Dict[int, Tuple[str, str]] = {}  # page -> (cache key, image path)
+
+    with tempfile.TemporaryDirectory(prefix="ocr-") as tmp:
+        for i in page_indices:
+            raster = render_page_raster(doc, i, dpi=dpi)
+            if isinstance(raster, Image.Image):
+                sizes[i] = raster.size
+                pixels = raster.tobytes()
+            else:
+                sizes[i] = (raster.width, raster.height)
+                pixels = raster.samples_mv
+            key = "ocr:{}:{}x{}".format(hashlib.sha256(pixels).hexdigest(), *sizes[i])
+            cached = RESULT_CACHE.get(key)
+            if cached is not None:
+                results[i] = cached
+                continue
+            path = os.path.join(tmp, f"page-{i}.pnm")
+            if isinstance(raster, Image.Image):
+                raster.save(path, format="PPM")
+            else:
+                raster.save(path)  # format from the .pnm extension
+            pending[i] = (key, path)
+
+        if pending:
+            order = sorted(pending)
+            batch = ocr_image_files([pending[i][1] for i in order])
+            for i, (text, pixel_boxes) in zip(order, batch or []):
+                results[i] = {"text": text, "boxes": [list(b) for b in pixel_boxes]}
+                RESULT_CACHE.put(pending[i][0], results[i])
+
+    out: Dict[int, Tuple[str, List[Rect]]] = {}
+    for i, res in results.items():
+        page = doc[i]
+        w, h = sizes[i]
+        sx = page.rect.width / w if w else 1.0
+        sy = page.rect.height / h if h else 1.0
+        out[i] = (res["text"], [(x0 * sx, y0 * sy, x1 * sx, y1 * sy) for (x0, y0, x1, y1) in res["boxes"]])
+    return out
@@ -1,30 +1,28 @@
 from __future__ import annotations
-from typing import Any, List
-from PIL import Image, ImageDraw, ImageFont
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Tuple, Union
+import os
 
-try:  # Lazy / guarded import of PyMuPDF
-    import fitz  # type: ignore
-    _HAVE_FITZ = True
-except Exception as e:  # broad: we specifically want to catch DLL load issues too
-    fitz = None  # type: ignore
-    _HAVE_FITZ = False
-    _FITZ_IMPORT_ERROR = e
-else:
-    _FITZ_IMPORT_ERROR = None  # type: ignore
+from .lazy import import_error, optional_import
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+
+def _fitz():
+    """PyMuPDF, imported on first use (None if it is missing or fails to load)."""
+    return optional_import("fitz")
 
 
 def have_fitz() -> bool:
-    return _HAVE_FITZ
+    return _fitz() is not None
 
 
-def load_pdf_doc(pdf_bytes: bytes):
-    """Return a document-like object.
+# Raw PDF bytes or the path of a PDF file on disk
+PdfSource = Union[bytes, str]
 
-    If PyMuPDF is unavailable, return a small shim with only the attributes used
-    elsewhere (len(doc), doc[i].rect.width/height). We approximate one blank page.
-    """
-    if _HAVE_FITZ:
-        return fitz.open(stream=pdf_bytes, filetype="pdf")  # type: ignore
+
+def _mock_doc(size_bytes: int):
+    """Small shim with only the attributes used elsewhere (len(doc), doc[i].rect.width/height)."""
 
     class _MockPage:
         def __init__(self, index: int):
@@ -34,20 +32,46 @@ def load_pdf_doc(pdf_bytes: bytes):
         pass
 
     # naive page estimate: assume ~150KB per page if bigger than that, else 1 page
-    est_pages = max(1, min(5, len(pdf_bytes) // 150_000 + 1))
+    est_pages = max(1, min(5, size_bytes // 150_000 + 1))
     return _MockDoc(_MockPage(i) for i in range(est_pages))
 
 
-def render_page_image(doc, page_index: int, dpi: int = 144) -> Image.Image:
-    if _HAVE_FITZ:
-        page = doc[page_index]
-        scale = dpi / 72.0
-        mat = fitz.Matrix(scale, scale)  # type: ignore
-        pix = page.get_pixmap(matrix=mat, alpha=False)
-        mode = "RGB" if pix.alpha == 0 else "RGBA"
-        img = Image.frombytes(mode, [pix.width, pix.height], pix.samples)
-        return img
+def load_pdf_doc(pdf_bytes: bytes):
+    """Return a document-like object.
+
+    If PyMuPDF is unavailable, return a small shim with only the attributes used
+    elsewhere (len(doc), doc[i].rect.width/height). We approximate one blank page.
+    """
+    fitz = _fitz()
+    if fitz is not None:
+        return fitz.open(stream=pdf_bytes, filetype="pdf")
+    return _mock_doc(len(pdf_bytes))
+
+
+def load_pdf_path(path: str):
+    """Like `load_pdf_doc`, but open a file on disk.
+
+    MuPDF reads the file on demand, so the document is never copied into a
+    Python ``bytes`` object.
+    """
+    fitz = _fitz()
+    if fitz is not None:
+        return fitz.open(path, filetype="pdf")
+    return _mock_doc(os.path.getsize(path))
+
+
+def open_pdf(source: PdfSource):
+    return load_pdf_path(source) if isinstance(source, str) else load_pdf_doc(source)
+
+
+# A rendered page: a fitz.Pixmap when PyMuPDF is available, else a PIL image.
+Raster = Any
+
+
+def _placeholder_image() -> Image.Image:
     # Fallback: simple blank page placeholder with message
+    from PIL import Image, ImageDraw
+
     width, height = 800, 1131  # approximate A4 @ ~96dpi
     img = Image.new("RGB", (width, height), (245, 245, 245))
     draw = ImageDraw.Draw(img)
@@ -56,5 +80,54 @@ def render_page_image(doc, page_index: int, dpi: int = 144) -> Image.Image:
     return img
 
 
-def fitz_import_error() -> Exception | None:
-    return _FITZ_IMPORT_ERROR
+def render_page_raster(doc, page_index: int, dpi: int = 144) -> Raster:
+    """Render a page without converting it to PIL (see `Raster`)."""
+    fitz = _fitz()
+    if fitz is not None:
+        scale = dpi / 72.0
+        mat = fitz.Matrix(scale, scale)
+        return doc[page_index].get_pixmap(matrix=mat, alpha=False)
+    return _placeholder_image()
+
+
+def pixmap_to_image(pix) -> Image.Image:
+    """Wrap a pixmap's sample buffer as a PIL image without copying it.
+
+    The image shares memory with the pixmap (which it keeps alive), so
+    drawing on it also changes the pixmap.
+    """
+    from PIL import Image
+
+    mode = "RGB" if pix.alpha == 0 else "RGBA"
+    img = Image.frombuffer(mode, (pix.width, pix.height), pix.samples_mv, "raw", mode, pix.stride, 1)
+    img.readonly = 0
+    img._pixmap = pix  # type: ignore[attr-defined]  # keep the buffer owner alive
+    return img
+
+
+def render_page_image(doc, page_index: int, dpi: int = 144) -> Image.Image:
+    from PIL import Image
+
+    raster = render_page_raster(doc, page_index, dpi=dpi)
+    if isinstance(raster, Image.Image):
+        return raster
+    return pixmap_to_image(raster)
+
+
+def render_page_range(doc, page_indices: Iterable[int], dpi: int = 144) -> Dict[int, Tuple[Raster, Tuple[float, float]]]:
+    """Rasterize each page once and pair it with its size in PDF points.
+
+    The returned rasters are shared by every adapter of a request; callers
+    annotate copies (see ``annotate_raster``) except for the last user.
+    """
+    rendered: Dict[int, Tuple[Raster, Tuple[float, float]]] = {}
+    for i in page_indices:
+        if i in rendered:
+            continue
+        page_rect = (doc[i].rect.width, doc[i].rect.height)
+        rendered[i] = (render_page_raster(doc, i, dpi=dpi), page_rect)
+    return rendered
+
+
+def fitz_import_error() -> BaseException | None:
+    return import_error("fitz") if not have_fitz() else None
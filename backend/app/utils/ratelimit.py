@@ -0,0 +1,191 @@
+from __future__ import annotations
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional, Tuple
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+_UNITS = {"second": 1.0, "minute": 60.0, "hour": 3600.0, "day": 86400.0}
+_SWEEP_INTERVAL = 60.0
+
+
+class RateLimit(NamedTuple):
+    """Token bucket: up to ``requests`` in a burst, refilled at ``requests / per_seconds``."""
+
+    requests: int
+    per_seconds: float
+
+    @property
+    def rate(self) -> float:
+        return self.requests / self.per_seconds
+
+    @classmethod
+    def parse(cls, value: str) -> Optional["RateLimit"]:
+        """``"12/minute"``, ``"100/hour"``, ``"5/10s"``; ``"off"``/``"0"`` means unlimited."""
+        value = value.strip().lower()
+        if value in ("", "0", "off", "none", "unlimited"):
+            return None
+        count, _, unit = value.partition("/")
+        unit = unit.strip() or "minute"
+        if unit.endswith("s") and unit[:-1].replace(".", "", 1).isdigit():
+            seconds = float(unit[:-1])
+        else:
+            seconds = _UNITS.get(unit.rstrip("s"), 0.0)
+        if not count.strip().isdigit() or seconds <= 0:
+            raise ValueError(f"Invalid rate limit {value!r}; use e.g. '12/minute'")
+        return cls(int(count), seconds)
+
+
+def _take(tokens: float, updated: float, now: float, limit: RateLimit) -> Tuple[bool, float, float, float]:
+    """Refill then try to take one token.
+
+    Returns (allowed, tokens, full_at, retry_after); ``full_at`` is when the
+    bucket is full again, after which the key can be forgotten.
+    """
+    tokens = min(float(limit.requests), tokens + (now - updated) * limit.rate)
+    allowed = tokens >= 1.0
+    if allowed:
+        tokens -= 1.0
+    retry_after = 0.0 if allowed else (1.0 - tokens) / limit.rate
+    full_at = now + (limit.requests - tokens) / limit.rate
+    return allowed, tokens, full_at, retry_after
+
+
+class MemoryBackend:
+    """Per-process buckets. Idle keys (full buckets) are swept periodically and
+    at most ``max_keys`` are kept, dropping the least recently seen first."""
+
+    name = "memory"
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        # key -> (tokens, updated, full_at)
+        self._buckets: "OrderedDict[str, Tuple[float, float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._next_sweep = 0.0
+
+    def take(self, key: str, limit: RateLimit) -> Tuple[bool, float]:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated, _ = self._buckets.get(key, (float(limit.requests), now, now))
+            allowed, tokens, full_at, retry_after = _take(tokens, updated, now, limit)
+            self._buckets[key] = (tokens, now, full_at)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            if now >= self._next_sweep:
+                self._sweep(now)
+        return allowed, retry_after
+
+    def _sweep(self, now: float) -> None:
+        self._next_sweep = now + _SWEEP_INTERVAL
+        for key in [k for k, (_, _, full_at) in self._buckets.items() if full_at <= now]:
+            del self._buckets[key]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"keys": len(self._buckets)}
+
+
+class SQLiteBackend:
+    """Buckets in a SQLite file, so every worker process on a host shares one limit."""
+
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL, updated REAL, full_at REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS buckets_full_at ON buckets (full_at)")
+        self._lock = threading.Lock()
+        self._next_sweep = 0.0
+
+    def take(self, key: str, limit: RateLimit) -> Tuple[bool, float]:
+        now = time.time()  # wall clock: shared across processes
+        with self._lock:
+            conn = self._conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute("SELECT tokens, updated FROM buckets WHERE key = ?", (key,)).fetchone()
+                tokens, updated = row if row else (float(limit.requests), now)
+                allowed, tokens, full_at, retry_after = _take(tokens, updated, now, limit)
+                conn.execute(
+                    "INSERT OR REPLACE INTO buckets (key, tokens, updated, full_at) VALUES (?, ?, ?, ?)",
+                    (key, tokens, now, full_at),
+                )
+                if now >= self._next_sweep:
+                    self._next_sweep = now + _SWEEP_INTERVAL
+                    conn.execute("DELETE FROM buckets WHERE full_at <= ?", (now,))
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return allowed, retry_after
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"keys": self._conn.execute("SELECT COUNT(*) FROM buckets").fetchone()[0]}
+
+
+class RateLimiter:
+    """Per-client token buckets with limits per route.
+
+    ``routes`` maps a path (e.g. ``/api/extract``) to its limit; other paths
+    use ``default``. A limit of None disables limiting for that route.
+    """
+
+    def __init__(self, backend, default: Optional[RateLimit], routes: Optional[Dict[str, Optional[RateLimit]]] = None):
+        self.backend = backend
+        self.default = default
+        self.routes = routes or {}
+
+    @classmethod
+    def from_env(cls) -> "RateLimiter":
+        if os.getenv("RATE_LIMIT_BACKEND", "memory").lower() == "sqlite":
+            backend = SQLiteBackend(os.getenv("RATE_LIMIT_SQLITE_PATH", "/tmp/pdf-playground-ratelimit.sqlite3"))
+        else:
+            backend = MemoryBackend(max_keys=int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000")))
+        routes: Dict[str, Optional[RateLimit]] = {}
+        for item in os.getenv("RATE_LIMIT_ROUTES", "").split(","):
+            path, sep, value = item.partition("=")
+            if sep and path.strip():
+                routes[path.strip()] = RateLimit.parse(value)
+        return cls(backend, RateLimit.parse(os.getenv("RATE_LIMIT_DEFAULT", "12/minute")), routes)
+
+    def limit_for(self, route: str) -> Optional[RateLimit]:
+        return self.routes[route] if route in self.routes else self.default
+
+    def allow(self, client: str, route: str) -> Tuple[bool, int]:
+        """Take one request from ``client``'s bucket for ``route``; returns (allowed, Retry-After seconds)."""
+        limit = self.limit_for(route)
+        if limit is None:
+            return True, 0
+        try:
+            allowed, retry_after = self.backend.take(f"{route}|{client}", limit)
+        except Exception as e:  # a broken shared store should not take the API down
+            logger.warning("Rate limiter backend failed, allowing request: %s", e)
+            return True, 0
+        return allowed, int(math.ceil(retry_after))
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "backend": self.backend.name,
+            "default": self.default._asdict() if self.default else None,
+            "routes": {r: (l._asdict() if l else None) for r, l in self.routes.items()},
+            **self.backend.stats(),
+        }
+
+
+RATE_LIMITER = RateLimiter.from_env()
@@ -0,0 +1,111 @@
+from __future__ import annotations
+from typing import Any, Iterator, List, Sequence
+import json
+
+try:
+    import orjson  # type: ignore
+    _HAVE_ORJSON = True
+except Exception:  # pragma: no cover
+    orjson = None  # type: ignore
+    _HAVE_ORJSON = False
+
+# Encoded output is yielded in pieces of about this size.
+CHUNK_BYTES = 64 * 1024
+
+
+class JoinedText:
+    """A string kept as ``sep.join(parts)`` without building it.
+
+    `iter_json` encodes the parts one by one, so a document's markdown is
+    never held as one multi-megabyte string; `str()` joins on demand.
+    """
+
+    __slots__ = ("parts", "sep")
+
+    def __init__(self, parts: Sequence[str], sep: str = ""):
+        self.parts = parts
+        self.sep = sep
+
+    def __str__(self) -> str:
+        return self.sep.join(self.parts)
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, JoinedText):
+        return str(obj)
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj: Any) -> bytes:
+    """Compact JSON as UTF-8 bytes; orjson when installed, else the stdlib."""
+    if _HAVE_ORJSON:
+        return orjson.dumps(obj, default=_default)
+    return json.dumps(obj, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _escaped(text: str) -> bytes:
+    # The JSON encoding of a string, without its quotes; escaping is per
+    # character, so concatenated pieces encode the concatenated string.
+    return dumps(text)[1:-1]
+
+
+class _Buffer:
+    def __init__(self):
+        self.parts: List[bytes] = []
+        self.size = 0
+
+    def add(self, data: bytes) -> None:
+        self.parts.append(data)
+        self.size += len(data)
+
+    def take(self) -> bytes:
+        data = b"".join(self.parts)
+        self.parts, self.size = [], 0
+        return data
+
+
+def _encode(obj: Any, buf: _Buffer) -> Iterator[bytes]:
+    if isinstance(obj, dict):
+        buf.add(b"{")
+        for n, (key, value) in enumerate(obj.items()):
+            buf.add(b',"' if n else b'"')
+            buf.add(_escaped(str(key)))
+            buf.add(b'":')
+            yield from _encode(value, buf)
+        buf.add(b"}")
+    elif isinstance(obj, (list, tuple)):
+        buf.add(b"[")
+        for n, value in enumerate(obj):
+            if n:
+                buf.add(b",")
+            yield from _encode(value, buf)
+        buf.add(b"]")
+    elif isinstance(obj, JoinedText):
+        buf.add(b'"')
+        sep = _escaped(obj.sep)
+        for n, part in enumerate(obj.parts):
+            if n and sep:
+                buf.add(sep)
+            buf.add(_escaped(part))
+            if buf.size >= CHUNK_BYTES:
+                yield buf.take()
+        buf.add(b'"')
+    else:
+        buf.add(dumps(obj))
+    if buf.size >= CHUNK_BYTES:
+        yield buf.take()
+
+
+def iter_json(obj: Any) -> Iterator[bytes]:
+    """Encode ``obj`` (dicts, lists, scalars, `JoinedText`) as JSON in ~64 KB pieces.
+
+    Values are written as they are reached rather than building one big
+    string, and no validation happens: callers pass trusted, already
+    shaped output.
+    """
+    buf = _Buffer()
+    yield from _encode(obj, buf)
+    if buf.size:
+        yield buf.take()
@@ -0,0 +1,149 @@
+from __future__ import annotations
+import hashlib
+import os
+import tempfile
+
+from starlette.formparsers import MultiPartParser
+
+_CHUNK_BYTES = 1024 * 1024
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+class SpooledPdf:
+    """An uploaded PDF written to a temp file, with its size and SHA-256 digest."""
+
+    def __init__(self, path: str, size: int, digest: str):
+        self.path = path
+        self.size = size
+        self.digest = digest
+
+    def close(self) -> None:
+        _discard(self.path)
+
+
+def _mkstemp(suffix: str):
+    tmp_dir = os.getenv("UPLOAD_TMP_DIR") or None
+    if tmp_dir:
+        os.makedirs(tmp_dir, exist_ok=True)
+    return tempfile.mkstemp(suffix=suffix, prefix="upload-", dir=tmp_dir)
+
+
+def _discard(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class _Spool:
+    """A temp file filled chunk by chunk, hashed and size-capped on the way.
+
+    Also the file object behind uploads parsed by `SpoolingMultiPartParser`:
+    `close` deletes the file unless `finish` handed it over first.
+    """
+
+    def __init__(self, max_bytes: int, suffix: str):
+        fd, self.path = _mkstemp(suffix)
+        self._out = os.fdopen(fd, "w+b")
+        self._hasher = hashlib.sha256()
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._finished = False
+
+    def write(self, chunk: bytes) -> int:
+        """Append a chunk; raises UploadTooLarge once more than ``max_bytes`` arrived."""
+        self.size += len(chunk)
+        if self.size > self.max_bytes:
+            raise UploadTooLarge()
+        self._hasher.update(chunk)
+        return self._out.write(chunk)
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        return self._out.seek(offset, whence)
+
+    def read(self, size: int = -1) -> bytes:
+        return self._out.read(size)
+
+    def finish(self) -> SpooledPdf:
+        self._out.close()
+        self._finished = True
+        return SpooledPdf(self.path, self.size, self._hasher.hexdigest())
+
+    def close(self) -> None:
+        self._out.close()
+        if not self._finished:
+            _discard(self.path)
+
+
+class SpoolingMultiPartParser(MultiPartParser):
+    """Starlette's multipart parser, writing file parts straight to a `_Spool`.
+
+    Starlette buffers each file part in a SpooledTemporaryFile that would
+    have to be copied again to get a named, hashed file. Here every file
+    part is hashed and capped at ``max_file_bytes`` as it arrives, and the
+    whole body (form fields included) at ``max_body_bytes``; either limit
+    raises UploadTooLarge and deletes what was spooled. Take the files over
+    with `claim_upload`.
+    """
+
+    def __init__(self, headers, stream, *, max_file_bytes: int, max_body_bytes: int, **kwargs):
+        super().__init__(headers, _capped(stream, max_body_bytes), **kwargs)
+        self.max_file_bytes = max_file_bytes
+
+    def on_headers_finished(self) -> None:
+        super().on_headers_finished()
+        upload = self._current_part.file
+        if upload is not None:
+            # Swap Starlette's still empty in-memory file for a spool on disk.
+            self._files_to_close_on_error.remove(upload.file)
+            upload.file.close()
+            suffix = ".zip" if (upload.filename or "").lower().endswith(".zip") else ".pdf"
+            upload.file = _Spool(self.max_file_bytes, suffix)
+            self._files_to_close_on_error.append(upload.file)
+
+    async def parse(self):
+        try:
+            return await super().parse()
+        except BaseException:
+            for spool in self._files_to_close_on_error:
+                spool.close()
+            raise
+
+
+async def _capped(stream, max_bytes: int):
+    received = 0
+    async for chunk in stream:
+        received += len(chunk)
+        if received > max_bytes:
+            raise UploadTooLarge()
+        yield chunk
+
+
+def claim_upload(file, max_bytes: int) -> SpooledPdf:
+    """Take over the temp file of an UploadFile parsed by `SpoolingMultiPartParser`.
+
+    Raises UploadTooLarge (and deletes the file) if it holds more than
+    ``max_bytes``. Otherwise the caller owns the file from now on.
+    """
+    spool = file.file
+    if not isinstance(spool, _Spool):
+        raise TypeError("upload was not parsed by SpoolingMultiPartParser")
+    if spool.size > max_bytes:
+        spool.close()
+        raise UploadTooLarge()
+    return spool.finish()
+
+
+def spool_fileobj(fh, max_bytes: int) -> SpooledPdf:
+    """Copy a file object, e.g. a zip archive member, to a temp file in chunks."""
+    spool = _Spool(max_bytes, ".pdf")
+    try:
+        for chunk in iter(lambda: fh.read(_CHUNK_BYTES), b""):
+            spool.write(chunk)
+        return spool.finish()
+    except BaseException:
+        spool.close()
+        raise
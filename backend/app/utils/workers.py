@@ -0,0 +1,66 @@
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+import logging
+import multiprocessing
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+_POOL: Optional[ProcessPoolExecutor] = None
+_POOL_LOCK = threading.Lock()
+
+
+def pool_size() -> int:
+    """Number of extraction worker processes (EXTRACT_WORKERS, default: CPU count)."""
+    default = os.cpu_count() or 1
+    try:
+        return max(1, int(os.getenv("EXTRACT_WORKERS", str(default))))
+    except ValueError:
+        return default
+
+
+def chunk_pages() -> int:
+    """Pages per worker task (EXTRACT_CHUNK_PAGES, default 8)."""
+    try:
+        return max(1, int(os.getenv("EXTRACT_CHUNK_PAGES", "8")))
+    except ValueError:
+        return 8
+
+
+def _init_worker() -> None:
+    """Warm the worker's own adapter registry so its first task pays no loading cost."""
+    from ..adapters import ADAPTER_REGISTRY, warmup_targets
+
+    targets = warmup_targets()
+    if targets:
+        ADAPTER_REGISTRY.warm_up(targets)
+
+
+def get_process_pool() -> Optional[ProcessPoolExecutor]:
+    """Return the shared worker pool, or None to run in-process.
+
+    The pool is created on first use and lives for the lifetime of the app.
+    With a single worker (e.g. one core) there is nothing to gain from extra
+    processes, so callers run the work in-process instead.
+    """
+    global _POOL
+    size = pool_size()
+    if size <= 1:
+        return None
+    with _POOL_LOCK:
+        if _POOL is None:
+            # spawn: forking a threaded server process is not safe
+            ctx = multiprocessing.get_context("spawn")
+            _POOL = ProcessPoolExecutor(max_workers=size, mp_context=ctx, initializer=_init_worker)
+            logger.info("Started extraction pool with %d workers", size)
+        return _POOL
+
+
+def shutdown_pool() -> None:
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is not None:
+            _POOL.shutdown(wait=False, cancel_futures=True)
+            _POOL = None
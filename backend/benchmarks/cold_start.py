@@ -0,0 +1,106 @@
+"""Cold-start latency: fresh interpreters from process start to the first response.
+
+Each run spawns a new Python process (as a serverless container would)
+that times four things:
+- ``import app.main``
+- ``create_app()``
+- app startup (startup handlers, through TestClient)
+- a first ``POST /api/extract`` of a one-page PDF
+
+The parent process also reports ``wall_ms``, from spawn to the child's
+exit, which includes interpreter start. Work deferred out of startup
+shows up in the first request. That is why the first request is measured
+too, with and without the background warm-up.
+
+Usage (from ``backend/``):
+
+    python -m benchmarks.cold_start --runs 5
+    python -m benchmarks.cold_start --runs 5 --warmup-background --settle 2
+    python -m benchmarks.cold_start --root /path/to/other/checkout/backend   # e.g. a baseline
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+_CHILD = r"""
+import json, sys, time
+t0 = time.perf_counter()
+import app.main
+t1 = time.perf_counter()
+application = app.main.create_app()
+t2 = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(application) as client:
+    t3 = time.perf_counter()
+    time.sleep(float(sys.argv[2]))  # lets a background warm-up run, as idle time before traffic would
+    with open(sys.argv[1], "rb") as fh:
+        pdf = fh.read()
+    t4 = time.perf_counter()
+    resp = client.post("/api/extract", files={"file": ("cold.pdf", pdf, "application/pdf")}, data={"models": "surya"})
+    t5 = time.perf_counter()
+    resp.raise_for_status()
+print(json.dumps({
+    "import_ms": (t1 - t0) * 1000, "create_app_ms": (t2 - t1) * 1000,
+    "startup_ms": (t3 - t2) * 1000, "first_request_ms": (t5 - t4) * 1000,
+}))
+"""
+
+
+def _one_page_pdf(path: str) -> None:
+    import fitz
+
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_text((72, 72), "Cold start", fontsize=18)
+    page.insert_text((72, 100), "A single page of body text.", fontsize=10)
+    doc.save(path)
+    doc.close()
+
+
+def run_once(root: str, pdf_path: str, settle: float, env: Dict[str, str]) -> Dict[str, float]:
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-c", _CHILD, pdf_path, str(settle)],
+        cwd=root, env=env, capture_output=True, text=True, check=True,
+    )
+    wall = (time.perf_counter() - start - settle) * 1000
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["wall_ms"] = wall
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--root", default=".", help="backend directory to start the app from")
+    parser.add_argument("--warmup-background", action="store_true", help="set WARMUP_BACKGROUND=1")
+    parser.add_argument("--settle", type=float, default=0.0, help="seconds between startup and the first request")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.update(EXTRACT_WORKERS="1", RATE_LIMIT_DEFAULT="off", RESULT_CACHE_MAX_ENTRIES="0")
+    if args.warmup_background:
+        env["WARMUP_BACKGROUND"] = "1"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = os.path.join(tmp, "cold.pdf")
+        _one_page_pdf(pdf_path)
+        run_once(args.root, pdf_path, 0.0, env)  # prime the OS file cache and .pyc files
+        runs: List[Dict[str, float]] = [run_once(args.root, pdf_path, args.settle, env) for _ in range(args.runs)]
+
+    print(f"{args.runs} cold starts from {os.path.abspath(args.root)} "
+          f"(warmup_background={args.warmup_background}, settle={args.settle}s)")
+    for key in ("import_ms", "create_app_ms", "startup_ms", "first_request_ms", "wall_ms"):
+        values = [r[key] for r in runs]
+        print(f"  {key:18} p50 {statistics.median(values):8.1f} ms  min {min(values):8.1f} ms  max {max(values):8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
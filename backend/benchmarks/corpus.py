@@ -0,0 +1,87 @@
+"""Synthetic PDF corpus for the benchmarks, generated locally with PyMuPDF.
+
+Each builder returns the bytes of a deterministic document:
+
+- ``text_heavy``: dense single-column body text.
+- ``many_blocks``: hundreds of small, separately placed text blocks per page.
+- ``image_only``: scanned-looking pages (one full-page image, no text layer).
+- ``large_pages``: A0-sized pages, to stress rasterization and encoding.
+"""
+from __future__ import annotations
+from typing import Callable, Dict
+
+_WORDS = "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor".split()
+
+
+def _line(n: int, words: int = 12) -> str:
+    return " ".join(_WORDS[(n + k) % len(_WORDS)] for k in range(words))
+
+
+def _finish(doc) -> bytes:
+    data = doc.tobytes(garbage=3, deflate=True)
+    doc.close()
+    return data
+
+
+def text_heavy(pages: int) -> bytes:
+    import fitz
+
+    doc = fitz.open()
+    for p in range(pages):
+        page = doc.new_page()
+        page.insert_text((72, 60), f"Text heavy page {p + 1}", fontsize=18)
+        for j in range(60):
+            page.insert_text((72, 90 + j * 11.5), _line(p + j, 14), fontsize=9)
+    return _finish(doc)
+
+
+def many_blocks(pages: int) -> bytes:
+    import fitz
+
+    doc = fitz.open()
+    for p in range(pages):
+        page = doc.new_page()
+        for j in range(300):
+            x = 36 + (j % 6) * 90
+            y = 40 + (j // 6) * 15
+            page.insert_text((x, y), _line(j, 2), fontsize=7)
+    return _finish(doc)
+
+
+def image_only(pages: int) -> bytes:
+    import fitz
+
+    # Render one text page to an image and place it full-page, like a scan.
+    src = fitz.open()
+    page = src.new_page()
+    for j in range(40):
+        page.insert_text((72, 72 + j * 17), _line(j), fontsize=11)
+    scan = page.get_pixmap(matrix=fitz.Matrix(150 / 72, 150 / 72), colorspace=fitz.csGRAY).tobytes("png")
+    src.close()
+
+    doc = fitz.open()
+    for _ in range(pages):
+        page = doc.new_page()
+        page.insert_image(page.rect, stream=scan)
+    return _finish(doc)
+
+
+def large_pages(pages: int) -> bytes:
+    import fitz
+
+    width, height = fitz.paper_size("a0")
+    doc = fitz.open()
+    for p in range(pages):
+        page = doc.new_page(width=width, height=height)
+        page.insert_text((100, 120), f"Large page {p + 1}", fontsize=48)
+        for j in range(120):
+            page.insert_text((100, 200 + j * 26), _line(p + j, 30), fontsize=14)
+    return _finish(doc)
+
+
+CORPUS: Dict[str, Callable[[int], bytes]] = {
+    "text_heavy": text_heavy,
+    "many_blocks": many_blocks,
+    "image_only": image_only,
+    "large_pages": large_pages,
+}
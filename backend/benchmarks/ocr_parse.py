@@ -0,0 +1,119 @@
+"""OCR backend benchmark: bulk TSV parsing and batched Tesseract calls.
+
+1. Parsing: the per-word DICT walk used by ``ocr_image_to_text_and_boxes``
+   (``pytesseract.file_to_dict`` + ``_parse_data_dict``) against the NumPy
+   ``parse_tsv`` (one ``np.loadtxt`` call for the numeric columns), on
+   synthetic Tesseract TSV for a dense multi-page scan. Both must produce
+   the same words and boxes. Measured here: 20 pages x 2000 words, 265-320
+   ms vs 75-90 ms (3-4x); 3 pages x 200 words, 4.3-4.6 ms vs 1.1-1.2 ms
+   (about 3.7x).
+2. End to end (only when the ``tesseract`` binary is installed): one
+   Tesseract process per page against a single batched ``ocr_image_files``
+   call on synthetic scanned pages.
+
+Usage (from ``backend/``):
+
+    python -m benchmarks.ocr_parse --pages 20 --words 2000
+"""
+from __future__ import annotations
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from app.utils.ocr import _parse_data_dict, ocr_image_files, ocr_image_to_text_and_boxes, parse_tsv
+
+_HEADER = "level\tpage_num\tblock_num\tpar_num\tline_num\tword_num\tleft\ttop\twidth\theight\tconf\ttext"
+
+
+def _synthetic_tsv(pages: int, words: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    lines = [_HEADER]
+    for p in range(1, pages + 1):
+        lines.append(f"1\t{p}\t0\t0\t0\t0\t0\t0\t1654\t2339\t-1\t")
+        for w in range(words):
+            x, y = rng.randint(0, 1500), rng.randint(0, 2200)
+            conf = rng.choice(["-1", "12.5", "88.1", "96"])
+            text = rng.choice(["lorem", "ipsum", "dolor", "", "sit", "amet"])
+            lines.append(f"5\t{p}\t1\t1\t{w // 12}\t{w % 12}\t{x}\t{y}\t{rng.randint(20, 120)}\t{rng.randint(18, 30)}\t{conf}\t{text}")
+    return "\n".join(lines) + "\n"
+
+
+def _best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_parse(pages: int, words: int, repeat: int) -> None:
+    import pytesseract
+
+    tsv = _synthetic_tsv(pages, words)
+    raw = tsv.encode("utf-8")
+    # The legacy path parses one image per call, so split the TSV per page.
+    per_page = [
+        "\n".join([_HEADER] + [l for l in tsv.splitlines()[1:] if l.split("\t")[1] == str(p)])
+        for p in range(1, pages + 1)
+    ]
+
+    def legacy():
+        return [_parse_data_dict(pytesseract.pytesseract.file_to_dict(page_tsv, "\t", -1)) for page_tsv in per_page]
+
+    bulk = parse_tsv(raw)
+    assert [bulk.get(p, ("", [])) for p in range(1, pages + 1)] == legacy(), "parse_tsv disagrees with the dict walk"
+
+    legacy_s = _best_of(legacy, repeat)
+    bulk_s = _best_of(lambda: parse_tsv(raw), repeat)
+    print(f"parse  {pages} pages x {words} words: dict walk {legacy_s * 1000:.1f} ms, "
+          f"numpy bulk {bulk_s * 1000:.1f} ms ({legacy_s / bulk_s:.1f}x)")
+
+
+def bench_tesseract(pages: int) -> None:
+    if shutil.which("tesseract") is None:
+        print("tesseract  skipped: tesseract binary not found")
+        return
+    import fitz
+    from PIL import Image
+
+    doc = fitz.open()
+    for p in range(pages):
+        page = doc.new_page()
+        for j in range(30):
+            page.insert_text((72, 72 + j * 22), f"Scanned benchmark page {p + 1} line {j} quick brown fox", fontsize=12)
+
+    with tempfile.TemporaryDirectory(prefix="ocr-bench-") as tmp:
+        paths = []
+        for p in range(pages):
+            path = os.path.join(tmp, f"page-{p}.pnm")
+            doc[p].get_pixmap(matrix=fitz.Matrix(200 / 72, 200 / 72)).save(path)
+            paths.append(path)
+
+        start = time.perf_counter()
+        for path in paths:
+            ocr_image_to_text_and_boxes(Image.open(path))
+        per_page_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        ocr_image_files(paths)
+        batch_s = time.perf_counter() - start
+
+    print(f"tesseract  {pages} pages: per-page calls {per_page_s:.2f} s, one batch {batch_s:.2f} s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--words", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    bench_parse(args.pages, args.words, args.repeat)
+    bench_tesseract(min(args.pages, 10))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""Stage and end-to-end benchmarks for the extraction pipeline.
+
+For each document of the synthetic corpus (``benchmarks/corpus.py``) this
+times every pipeline stage directly: ``load_pdf_doc``, the shared page
+analysis, each adapter, page rendering, annotation and encoding (image
+format + base64). It then drives ``POST /api/extract`` through FastAPI's
+TestClient. Each stage reports calls, throughput, p50/p95 latency and
+memory. ``py_peak_kb`` is the tracemalloc peak (Python heap), measured in a
+separate pass so tracing does not skew latencies. ``rss_kb`` is the
+largest resident-set increase across a call while its result is alive,
+which covers MuPDF's own buffers (Linux only).
+
+The result cache and the rate limiter are disabled so every request does
+real work. Results can be saved as a JSON baseline and later compared
+against it.
+
+Usage (from ``backend/``):
+
+    python -m benchmarks.pipeline --pages 10 --repeat 5 --save baseline.json
+    python -m benchmarks.pipeline --pages 10 --repeat 5 --compare baseline.json --tolerance 0.25
+"""
+from __future__ import annotations
+import argparse
+import base64
+import json
+import os
+import platform
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+os.environ["RESULT_CACHE_MAX_ENTRIES"] = "0"
+os.environ.setdefault("EXTRACT_WORKERS", "1")
+os.environ["RATE_LIMIT_DEFAULT"] = "off"  # repeats from one client would be rejected
+os.environ["RATE_LIMIT_ROUTES"] = ""
+
+from benchmarks.corpus import CORPUS  # noqa: E402
+
+
+def _rss_kb() -> Optional[int]:
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * (os.sysconf("SC_PAGE_SIZE") // 1024)
+    except (OSError, ValueError):
+        return None
+
+
+def _percentile(values: List[float], q: float) -> float:
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[int(q) - 1]
+
+
+class Stage:
+    """Latency samples plus memory figures for one stage."""
+
+    def __init__(self, units: str = "calls"):
+        self.units = units
+        self.samples: List[float] = []
+        self.units_done = 0
+        self.py_peak_kb = 0
+        self.rss_kb: Optional[int] = None
+
+    def time(self, fn: Callable[[], Any], units: int = 1) -> Any:
+        start = time.perf_counter()
+        result = fn()
+        self.samples.append(time.perf_counter() - start)
+        self.units_done += units
+        return result
+
+    def trace(self, fn: Callable[[], Any]) -> Any:
+        """Run ``fn`` once under tracemalloc and RSS sampling."""
+        rss_before = _rss_kb()
+        tracemalloc.start()
+        try:
+            result = fn()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.py_peak_kb = max(self.py_peak_kb, peak // 1024)
+        rss_after = _rss_kb()
+        if rss_before is not None and rss_after is not None:
+            self.rss_kb = max(self.rss_kb or 0, rss_after - rss_before)
+        return result
+
+    def report(self) -> Dict[str, Any]:
+        total = sum(self.samples)
+        return {
+            "calls": len(self.samples),
+            f"{self.units}_per_s": round(self.units_done / total, 2) if total else None,
+            "p50_ms": round(_percentile(self.samples, 50) * 1000, 3),
+            "p95_ms": round(_percentile(self.samples, 95) * 1000, 3),
+            "py_peak_kb": self.py_peak_kb,
+            "rss_kb": self.rss_kb,
+        }
+
+
+def bench_stages(pdf: bytes, repeat: int, dpi: int, image_format: str) -> Dict[str, Dict[str, Any]]:
+    from app.adapters import ADAPTER_REGISTRY
+    from app.adapters.analysis import DocumentAnalysis
+    from app.utils.annotate import annotate_raster
+    from app.utils.imaging import encode_raster
+    from app.utils.pdf import load_pdf_doc, render_page_raster
+
+    stages: Dict[str, Stage] = {"load_pdf_doc": Stage("docs"), "analysis": Stage("pages")}
+    for name in ADAPTER_REGISTRY.names():
+        stages[f"adapter:{name}"] = Stage("pages")
+    stages.update(render=Stage("pages"), annotate=Stage("pages"), encode=Stage("pages"))
+
+    def one_pass(measure: Callable[[Stage, Callable[[], Any]], Any]) -> None:
+        doc = measure(stages["load_pdf_doc"], lambda: load_pdf_doc(pdf))
+        analysis = DocumentAnalysis(doc)
+        for i in range(len(doc)):
+            measure(stages["analysis"], lambda: analysis.page(i))
+            blocks: List = []
+            for name in ADAPTER_REGISTRY.names():
+                with ADAPTER_REGISTRY.acquire(name) as adapter:
+                    _, by_page = measure(stages[f"adapter:{name}"], lambda: adapter.extract(doc, pages=[i], analysis=analysis))
+                blocks = by_page.get(i, [])
+            rect = (doc[i].rect.width, doc[i].rect.height)
+            raster = measure(stages["render"], lambda: render_page_raster(doc, i, dpi=dpi))
+            annotated = measure(stages["annotate"], lambda: annotate_raster(raster, blocks, rect, copy=True))
+            measure(stages["encode"], lambda: base64.b64encode(encode_raster(annotated, image_format)))
+            del raster, annotated
+        doc.close()
+
+    one_pass(lambda stage, fn: stage.trace(fn))
+    for _ in range(repeat):
+        one_pass(lambda stage, fn: stage.time(fn))
+    return {name: stage.report() for name, stage in stages.items()}
+
+
+def bench_endpoint(client, pdf: bytes, pages: int, repeat: int, preset: str) -> Dict[str, Any]:
+    stage = Stage("pages")
+    rss_start = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    for _ in range(repeat):
+        resp = stage.time(
+            lambda: client.post(
+                "/api/extract",
+                files={"file": ("bench.pdf", pdf, "application/pdf")},
+                data={"models": "surya,docling,mineru", "preset": preset},
+            ),
+            units=pages,
+        )
+        resp.raise_for_status()
+    report = stage.report()
+    report["py_peak_kb"] = None
+    report["rss_kb"] = None
+    report["max_rss_growth_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_start
+    report["response_kb"] = round(len(resp.content) / 1024, 1)
+    return report
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """p50 regressions beyond ``tolerance`` (0.25 = 25% slower) against a saved baseline."""
+    regressions = []
+    for corpus, stages in results["results"].items():
+        for stage, now in stages.items():
+            before = baseline.get("results", {}).get(corpus, {}).get(stage)
+            if not before or not before.get("p50_ms"):
+                continue
+            ratio = now["p50_ms"] / before["p50_ms"]
+            if ratio > 1 + tolerance:
+                regressions.append(f"{corpus}/{stage}: p50 {before['p50_ms']} -> {now['p50_ms']} ms ({ratio:.2f}x)")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--dpi", type=int, default=72)
+    parser.add_argument("--format", default="png", choices=["png", "webp", "jpeg"])
+    parser.add_argument("--preset", default="balanced")
+    parser.add_argument("--corpus", nargs="*", default=list(CORPUS), choices=list(CORPUS))
+    parser.add_argument("--save", help="write results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON to compare p50 latencies against")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    import fitz
+    from fastapi.testclient import TestClient
+    from app.main import create_app
+
+    results: Dict[str, Any] = {
+        "meta": {
+            "python": platform.python_version(),
+            "pymupdf": fitz.VersionBind,
+            "platform": platform.platform(),
+            "pages": args.pages,
+            "repeat": args.repeat,
+            "dpi": args.dpi,
+            "format": args.format,
+            "preset": args.preset,
+        },
+        "results": {},
+    }
+    with TestClient(create_app()) as client:
+        for name in args.corpus:
+            pdf = CORPUS[name](args.pages)
+            report = bench_stages(pdf, args.repeat, args.dpi, args.format)
+            report["endpoint:/api/extract"] = bench_endpoint(client, pdf, args.pages, args.repeat, args.preset)
+            results["results"][name] = report
+            print(f"== {name} ({len(pdf) / 1024:.0f} KB)")
+            for stage, r in report.items():
+                rate = next(v for k, v in r.items() if k.endswith("_per_s"))
+                print(f"  {stage:24} p50 {r['p50_ms']:9.3f} ms  p95 {r['p95_ms']:9.3f} ms  "
+                      f"{rate or 0:9.1f}/s  py_peak {r['py_peak_kb']} KB  rss {r['rss_kb']} KB")
+
+    if args.save:
+        with open(args.save, "w") as fh:
+            json.dump(results, fh, indent=2)
+        print(f"saved {args.save}")
+    if args.compare:
+        with open(args.compare) as fh:
+            regressions = compare(results, json.load(fh), args.tolerance)
+        for line in regressions:
+            print("REGRESSION", line)
+        if regressions:
+            sys.exit(1)
+        print(f"no p50 regressions beyond {args.tolerance:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Peak-RSS benchmark for the page raster pipeline.
+
+Compares the PIL path (one render per page, ``Image.frombytes`` +
+``img.copy()`` per model + Pillow PNG) with the pixmap path used by
+``app.pipeline`` (shared pixmap, in-place annotation for the last model,
+``pix.tobytes()`` encoding).
+Each variant runs in a fresh subprocess so peak RSS is not shared.
+
+Usage (from ``backend/``):
+
+    python -m benchmarks.raster_memory --pages 50 --models 3 --dpi 144
+"""
+from __future__ import annotations
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+
+
+def _make_pdf(pages: int) -> bytes:
+    import fitz
+
+    doc = fitz.open()
+    for i in range(pages):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"Benchmark page {i + 1}", fontsize=20)
+        for j in range(40):
+            page.insert_text((72, 110 + j * 17), f"Line {j} of synthetic text on page {i + 1}.", fontsize=10)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def _run_legacy(doc, pages: int, models: int, dpi: int) -> int:
+    import io
+    from PIL import Image
+    import fitz
+    from app.utils.annotate import annotate_blocks
+
+    total = 0
+    scale = dpi / 72.0
+    for i in range(pages):
+        page = doc[i]
+        blocks = [tuple(b[:4]) for b in page.get_text("blocks")]
+        rect = (page.rect.width, page.rect.height)
+        pix = page.get_pixmap(matrix=fitz.Matrix(scale, scale), alpha=False)
+        img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+        for _ in range(models):
+            annotated = annotate_blocks(img, blocks, rect)
+            buf = io.BytesIO()
+            annotated.save(buf, format="PNG", optimize=True)
+            total += len(buf.getvalue())
+    return total
+
+
+def _run_pixmap(doc, pages: int, models: int, dpi: int) -> int:
+    from app.utils.annotate import annotate_raster
+    from app.utils.imaging import encode_raster
+    from app.utils.pdf import render_page_raster
+
+    total = 0
+    for i in range(pages):
+        page = doc[i]
+        blocks = [tuple(b[:4]) for b in page.get_text("blocks")]
+        rect = (page.rect.width, page.rect.height)
+        raster = render_page_raster(doc, i, dpi=dpi)
+        for m in range(models):
+            annotated = annotate_raster(raster, blocks, rect, copy=m < models - 1)
+            total += len(encode_raster(annotated, "png"))
+    return total
+
+
+def _child(variant: str, pages: int, models: int, dpi: int) -> None:
+    from app.utils.pdf import load_pdf_doc
+
+    doc = load_pdf_doc(_make_pdf(pages))
+    base_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    fn = _run_legacy if variant == "legacy" else _run_pixmap
+    encoded = fn(doc, pages, models, dpi)
+    elapsed = time.perf_counter() - start
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({
+        "variant": variant,
+        "seconds": round(elapsed, 3),
+        "peak_rss_mb": round(peak_rss / 1024, 1),
+        "rss_growth_mb": round((peak_rss - base_rss) / 1024, 1),
+        "encoded_mb": round(encoded / 1e6, 2),
+    }))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--models", type=int, default=3)
+    parser.add_argument("--dpi", type=int, default=144)
+    parser.add_argument("--child", choices=["legacy", "pixmap"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child(args.child, args.pages, args.models, args.dpi)
+        return
+
+    for variant in ("legacy", "pixmap"):
+        cmd = [sys.executable, "-m", "benchmarks.raster_memory", "--child", variant,
+               "--pages", str(args.pages), "--models", str(args.models), "--dpi", str(args.dpi)]
+        out = subprocess.run(cmd, check=True, capture_output=True, text=True).stdout
+        print(out.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    main()
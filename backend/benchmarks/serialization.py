@@ -0,0 +1,153 @@
+"""Response assembly, serialization and compression for a large document.
+
+Runs one real extraction of a synthetic document (200 pages by default,
+all models) and builds the ``/api/extract`` response from it in two ways:
+
+- ``pydantic``: the previous path. Markdown is joined per model, wrapped in
+  ``ModelOutput``/``ExtractResponse``, then FastAPI's ``serialize_response``
+  (dump, re-validate, dump as JSON) and ``JSONResponse`` rendering run.
+- ``iter_json``: the current path. It builds a plain body with `JoinedText`
+  markdown, encoded incrementally by ``app.utils.serialize.iter_json``
+  (orjson when installed). ``streamed`` is the same encoding with each
+  chunk dropped once produced, as the endpoint sends it.
+
+Each path reports its p50 latency, the tracemalloc peak and the output size.
+The output is then compressed with gzip and, when installed, brotli.
+
+Usage (from ``backend/``):
+
+    python -m benchmarks.serialization --pages 200 --image-mode inline
+    python -m benchmarks.serialization --pages 200 --image-mode none
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import os
+import statistics
+import time
+import tracemalloc
+import zlib
+from typing import Any, Callable, Dict
+
+os.environ["RESULT_CACHE_MAX_ENTRIES"] = "0"
+os.environ.setdefault("EXTRACT_WORKERS", "1")
+
+from benchmarks.corpus import CORPUS  # noqa: E402
+
+
+def _measure(fn: Callable[[], Any], repeat: int) -> Dict[str, Any]:
+    tracemalloc.start()
+    try:
+        result = fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return {"p50_ms": round(statistics.median(samples) * 1000, 2), "py_peak_kb": peak // 1024, "result": result}
+
+
+def _extract(pdf: bytes, models, opts) -> dict:
+    from app.pipeline import ExtractionRun
+    from app.routers.extract import _collect
+
+    run = ExtractionRun(pdf, models, range(_page_count(pdf)), True, opts)
+    # Inline images never need the request (only blob URLs do).
+    return asyncio.run(_collect(None, run))  # type: ignore[arg-type]
+
+
+def _page_count(pdf: bytes) -> int:
+    import fitz
+
+    with fitz.open(stream=pdf, filetype="pdf") as doc:
+        return len(doc)
+
+
+def pydantic_path(body: dict, pages_md: Dict[str, list]) -> bytes:
+    from fastapi.responses import JSONResponse
+    from fastapi.routing import serialize_response
+    from fastapi.utils import create_response_field
+    from app.schemas import ExtractResponse, ModelMeta, ModelOutput
+
+    response = ExtractResponse(
+        pages=body["pages"],
+        models={
+            name: ModelOutput(
+                text_markdown="\n\n".join(pages_md[name]),
+                annotated_images=out["annotated_images"],
+                meta=ModelMeta(**out["meta"]),
+                blocks=out["blocks"],
+            )
+            for name, out in body["models"].items()
+        },
+        page_images=body["page_images"],
+        stage_ms=body["stage_ms"],
+    )
+    field = create_response_field(name="Response_extract", type_=ExtractResponse)
+    content = asyncio.run(serialize_response(field=field, response_content=response))
+    return JSONResponse(content).body
+
+
+def iter_json_path(body: dict) -> bytes:
+    from app.utils.serialize import iter_json
+
+    return b"".join(iter_json(body))
+
+
+def iter_json_streamed(body: dict) -> int:
+    """What the endpoint does: chunks are sent on as they are produced."""
+    from app.utils.serialize import iter_json
+
+    return sum(len(chunk) for chunk in iter_json(body))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--corpus", default="text_heavy", choices=list(CORPUS))
+    parser.add_argument("--image-mode", default="inline", choices=["inline", "none"])
+    parser.add_argument("--preset", default="fast")
+    args = parser.parse_args()
+
+    from app.adapters import KNOWN_MODELS
+    from app.pipeline import RENDER_PRESETS, RenderOptions
+    from app.utils import compression, serialize
+
+    opts = RenderOptions(image_mode=args.image_mode, **RENDER_PRESETS[args.preset])
+    pdf = CORPUS[args.corpus](args.pages)
+    start = time.perf_counter()
+    body = _extract(pdf, list(KNOWN_MODELS), opts)
+    print(f"extracted {args.pages} pages x {len(KNOWN_MODELS)} models in {time.perf_counter() - start:.1f}s "
+          f"(image_mode={args.image_mode}, preset={args.preset}, orjson={serialize._HAVE_ORJSON})")
+    pages_md = {name: list(out["text_markdown"].parts) for name, out in body["models"].items()}
+
+    results = {
+        "pydantic": _measure(lambda: pydantic_path(body, pages_md), args.repeat),
+        "iter_json": _measure(lambda: iter_json_path(body), args.repeat),
+        "streamed": _measure(lambda: iter_json_streamed(body), args.repeat),
+    }
+    for name, r in results.items():
+        size = r["result"] if isinstance(r["result"], int) else len(r["result"])
+        print(f"  {name:10} p50 {r['p50_ms']:9.2f} ms  py_peak {r['py_peak_kb']:8} KB  size {size / 1024:9.1f} KB")
+
+    data = results["iter_json"]["result"]
+    codecs: Dict[str, Callable[[bytes], bytes]] = {
+        "gzip-1": lambda b: zlib.compress(b, 1),
+        "gzip-5": lambda b: zlib.compress(b, 5),
+        "gzip-9": lambda b: zlib.compress(b, 9),
+    }
+    if compression._HAVE_BROTLI:
+        codecs["brotli-4"] = lambda b: compression.brotli.compress(b, quality=4)
+        codecs["brotli-9"] = lambda b: compression.brotli.compress(b, quality=9)
+    for name, codec in codecs.items():
+        r = _measure(lambda: codec(data), args.repeat)
+        size = len(r["result"])
+        print(f"  {name:10} p50 {r['p50_ms']:9.2f} ms  size {size / 1024:9.1f} KB  ({size / len(data):.1%} of raw)")
+
+
+if __name__ == "__main__":
+    main()
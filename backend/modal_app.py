@@ -5,6 +5,7 @@ image = (
     modal.Image.debian_slim()
     .apt_install("tesseract-ocr", "libtesseract-dev")  # For OCR support
     .pip_install_from_requirements("requirements.txt")
+    .env({"WARMUP_BACKGROUND": "1"})  # Serve immediately after a cold start; load libraries meanwhile
     .add_local_dir("app", remote_path="/root/app")  # Add the entire app directory
 )
 
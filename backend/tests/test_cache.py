@@ -0,0 +1,21 @@
+from app.utils.cache import ResultCache
+
+
+def test_memory_tier_is_bounded_by_serialized_bytes():
+    cache = ResultCache(max_entries=100, max_bytes=300)
+    for i in range(5):
+        cache.put(f"k{i}", {"image": "x" * 90})
+    assert list(cache._mem) == ["k3", "k4"]
+    assert cache.stats()["bytes"] <= 300
+
+    cache.put("huge", {"image": "x" * 400})
+    assert cache.get("huge") is None
+    assert list(cache._mem) == ["k3", "k4"]
+
+
+def test_overwriting_a_disk_entry_does_not_count_it_twice(tmp_path):
+    cache = ResultCache(max_entries=100, disk_dir=str(tmp_path))
+    for size in (100, 300, 200):
+        cache.put("k", {"image": "x" * size})
+    on_disk = sum(p.stat().st_size for p in tmp_path.iterdir())
+    assert cache.stats()["disk_bytes"] == on_disk
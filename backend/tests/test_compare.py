@@ -0,0 +1,18 @@
+from app.utils.compare import compare_models
+
+
+def test_excluded_pages_are_not_scored_as_agreement():
+    models = ["a", "b"]
+    markdown = {"a": {0: "one two three", 1: ""}, "b": {0: "one two four", 1: ""}}
+    boxes = {"a": {0: [(0, 0, 1, 1)], 1: []}, "b": {0: [(0, 0, 1, 0.5)], 1: []}}
+
+    full = compare_models(models, [0, 1], markdown, boxes)
+    assert full["excluded_pages"] == [] and len(full["pages"]) == 2
+
+    result = compare_models(models, [0, 1], markdown, boxes, excluded={1})
+    assert result["excluded_pages"] == [2]
+    assert [p["page"] for p in result["pages"]] == [1]
+    assert result["text_similarity"][0][1] == result["pages"][0]["text_similarity"][0][1] < full["text_similarity"][0][1]
+
+    nothing = compare_models(models, [0, 1], markdown, boxes, excluded={0, 1})
+    assert nothing["text_similarity"] is None and nothing["pages"] == [] and nothing["excluded_pages"] == [1, 2]
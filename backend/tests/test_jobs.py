@@ -0,0 +1,44 @@
+import asyncio
+
+from app.jobs import JobQueue
+
+
+def _returning(result):
+    async def runner(job):
+        return result
+
+    return runner
+
+
+async def _finish(queue, jobs):
+    for _ in range(100):
+        if all(job.finished for job in jobs):
+            return
+        await asyncio.sleep(0)
+    raise AssertionError("jobs did not finish")
+
+
+def test_oldest_finished_jobs_are_evicted_past_count_and_byte_caps():
+    async def scenario():
+        queue = JobQueue(max_queued=8, concurrency=1, max_finished=3, max_result_bytes=100)
+        jobs = []
+        for _ in range(4):
+            jobs.append(queue.submit(_returning({"pages": "x" * 10}), ["surya"], 1))
+            await _finish(queue, jobs)
+        # Count cap: the first job went once the fourth finished.
+        assert [queue.get(j.id) for j in jobs] == [None] + jobs[1:]
+
+        big = queue.submit(_returning({"pages": "x" * 60}), ["surya"], 1)
+        await _finish(queue, [big])
+        # Byte cap: 3 x 22 + 72 bytes is over 100, so the oldest go until it fits.
+        assert [queue.get(j.id) for j in jobs[1:]] == [None, None, jobs[3]]
+        assert queue.get(big.id) is big and big.status == "done"
+        assert queue.stats()["result_bytes"] == jobs[3].result_bytes + big.result_bytes <= 100
+
+        huge = queue.submit(_returning({"pages": "x" * 200}), ["surya"], 1)
+        await _finish(queue, [huge])
+        assert huge.status == "failed" and huge.result is None and "too large" in huge.error
+        assert queue.get(big.id) is big
+        await queue.stop()
+
+    asyncio.run(scenario())
@@ -0,0 +1,30 @@
+from app.utils.ocr import parse_tsv
+
+HEADER = "level\tpage_num\tblock_num\tpar_num\tline_num\tword_num\tleft\ttop\twidth\theight\tconf\ttext"
+
+
+def _tsv(*rows: str) -> bytes:
+    return "\n".join((HEADER,) + rows).encode("utf-8")
+
+
+def test_parse_tsv_without_words_is_empty():
+    tsv = _tsv(
+        "1\t1\t0\t0\t0\t0\t0\t0\t800\t600\t-1\t",
+        "2\t1\t1\t0\t0\t0\t10\t10\t100\t20\t-1\t",
+        "3\t1\t1\t1\t0\t0\t10\t10\t100\t20\t-1\t",
+        "4\t1\t1\t1\t1\t0\t10\t10\t100\t20\t-1\t",
+        "1\t2\t0\t0\t0\t0\t0\t0\t800\t600\t-1\t",
+    )
+    assert parse_tsv(tsv) == {}
+
+
+def test_parse_tsv_skips_blank_and_noisy_pages():
+    tsv = _tsv(
+        "1\t1\t0\t0\t0\t0\t0\t0\t800\t600\t-1\t",
+        "5\t1\t1\t1\t1\t1\t5\t5\t3\t3\t-1\t ",
+        "1\t2\t0\t0\t0\t0\t0\t0\t800\t600\t-1\t",
+        "5\t2\t1\t1\t1\t1\t10\t20\t30\t10\t96.5\tHello",
+        "5\t2\t1\t1\t1\t2\t50\t20\t40\t10\t91\tworld",
+        "5\t2\t1\t1\t1\t3\t95\t20\t5\t10\t-1\t~",
+    )
+    assert parse_tsv(tsv) == {2: ("Hello world", [(10.0, 20.0, 40.0, 30.0), (50.0, 20.0, 90.0, 30.0)])}
@@ -0,0 +1,59 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import fitz
+import pytest
+
+from app import pipeline
+from app.pipeline import TIMED_OUT, ExtractionRun, RenderOptions, process_pages
+from app.utils.cache import ResultCache
+
+
+def _pdf(pages: int) -> bytes:
+    doc = fitz.open()
+    for k in range(pages):
+        doc.new_page().insert_text((72, 72), f"page {k + 1} text")
+    return doc.tobytes()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A fake ``time.time()`` that advances one second per finished model page."""
+    now = [1000.0]
+    monkeypatch.setattr(pipeline, "time", SimpleNamespace(time=lambda: now[0], perf_counter=time.perf_counter))
+    boxes = pipeline.normalized_boxes
+
+    def tick(*args):
+        now[0] += 1.0
+        return boxes(*args)
+
+    monkeypatch.setattr(pipeline, "normalized_boxes", tick)
+    return now
+
+
+def test_process_pages_returns_finished_pages_at_the_deadline(clock):
+    doc = fitz.open(stream=_pdf(5), filetype="pdf")
+    wanted = {i: ["surya"] for i in range(5)}
+    entries, _ = process_pages(doc, wanted, RenderOptions(image_mode="none"), deadline=clock[0] + 2.5)
+
+    pages = entries["surya"]
+    assert [i for i in sorted(pages) if "degraded" not in pages[i]] == [0, 1, 2]
+    assert all(pages[i]["markdown"] for i in (0, 1, 2))
+    assert [pages[i]["degraded"] for i in (3, 4)] == [[TIMED_OUT], [TIMED_OUT]]
+
+
+def test_run_with_time_budget_merges_finished_and_timed_out_pages(clock, monkeypatch):
+    monkeypatch.setenv("EXTRACT_WORKERS", "1")
+    monkeypatch.setenv("EXTRACT_CHUNK_PAGES", "8")
+    monkeypatch.setattr(pipeline, "RESULT_CACHE", ResultCache())
+    run = ExtractionRun(_pdf(6), ["surya"], range(6), True, RenderOptions(image_mode="none"), time_budget=3.5)
+
+    async def collect():
+        return {i: entry async for _, i, entry in run.computed()}
+
+    pages = asyncio.run(collect())
+    assert sorted(pages) == list(range(6))
+    assert [i for i in sorted(pages) if "degraded" not in pages[i]] == [0, 1, 2, 3]
+    assert run.totals["surya"].degraded == {TIMED_OUT: [5, 6]}
+    assert len(pipeline.RESULT_CACHE._mem) == 4
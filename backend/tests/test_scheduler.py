@@ -0,0 +1,43 @@
+import asyncio
+
+import pytest
+
+from app.scheduler import CostScheduler, SchedulerBusy
+
+
+def test_request_over_max_queued_waits_then_is_admitted():
+    async def scenario():
+        scheduler = CostScheduler(budget=64, max_queued=512, max_wait=5)
+        busy = [await scheduler.acquire(40, "a"), await scheduler.acquire(20, "a")]
+        waiting = asyncio.create_task(scheduler.acquire(700, "b"))
+        await asyncio.sleep(0)
+        assert not waiting.done()  # queued behind the busy server, not rejected
+        assert scheduler.stats()["waiting"] == 1
+        for held in busy:
+            scheduler.release(held)
+        ticket = await asyncio.wait_for(waiting, 1)
+        assert ticket.cost == 700 and ticket.charge == 32
+        scheduler.release(ticket)
+        assert scheduler.stats()["in_flight_cost"] == 0
+        assert scheduler.rejected == 0
+
+    asyncio.run(scenario())
+
+
+def test_rejected_attempt_does_not_push_back_client_tag():
+    async def scenario():
+        scheduler = CostScheduler(budget=10, max_queued=5, max_wait=5)
+        busy = [await scheduler.acquire(5, "a"), await scheduler.acquire(5, "a")]
+        first = asyncio.create_task(scheduler.acquire(5, "b"))
+        await asyncio.sleep(0)
+        assert scheduler.stats()["waiting"] == 1
+        tags = dict(scheduler._client_tags)
+        for _ in range(3):
+            with pytest.raises(SchedulerBusy):
+                await scheduler.acquire(5, "c")
+        assert scheduler._client_tags == tags
+        for held in busy:
+            scheduler.release(held)
+        scheduler.release(await first)
+
+    asyncio.run(scenario())
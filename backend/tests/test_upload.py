@@ -0,0 +1,98 @@
+import asyncio
+import hashlib
+import io
+import os
+import zipfile
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.datastructures import Headers
+
+from app.routers.extract import FORM_OVERHEAD_BYTES, MAX_FILE_BYTES, _expand_zip
+from app.utils.upload import SpoolingMultiPartParser, UploadTooLarge, claim_upload, spool_fileobj
+
+BOUNDARY = "test-boundary"
+
+
+def _body(data: bytes) -> bytes:
+    return (
+        f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"models\"\r\n\r\nsurya\r\n"
+        f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"a.pdf\"\r\n"
+        "Content-Type: application/pdf\r\n\r\n"
+    ).encode() + data + f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+def _parse(body: bytes, max_file_bytes: int, max_body_bytes: int):
+    async def stream():
+        for k in range(0, len(body), 1000):
+            yield body[k:k + 1000]
+
+    headers = Headers({"content-type": f"multipart/form-data; boundary={BOUNDARY}"})
+    parser = SpoolingMultiPartParser(headers, stream(), max_file_bytes=max_file_bytes, max_body_bytes=max_body_bytes)
+    return asyncio.run(parser.parse())
+
+
+@pytest.fixture
+def tmp_uploads(tmp_path, monkeypatch):
+    monkeypatch.setenv("UPLOAD_TMP_DIR", str(tmp_path))
+    return tmp_path
+
+
+def test_file_parts_are_spooled_once_with_their_digest(tmp_uploads):
+    data = os.urandom(5000)
+    form = _parse(_body(data), max_file_bytes=10_000, max_body_bytes=20_000)
+    assert form["models"] == "surya"
+
+    upload = claim_upload(form["file"], 10_000)
+    assert (upload.size, upload.digest) == (len(data), hashlib.sha256(data).hexdigest())
+    assert os.listdir(tmp_uploads) == [os.path.basename(upload.path)]
+    asyncio.run(form.close())  # the claimed file stays
+    with open(upload.path, "rb") as fh:
+        assert fh.read() == data
+
+
+@pytest.mark.parametrize("max_file_bytes, max_body_bytes", [(4000, 20_000), (10_000, 3000)])
+def test_oversized_parts_and_bodies_stop_while_received(tmp_uploads, max_file_bytes, max_body_bytes):
+    with pytest.raises(UploadTooLarge):
+        _parse(_body(os.urandom(5000)), max_file_bytes, max_body_bytes)
+    assert os.listdir(tmp_uploads) == []
+
+
+def test_unclaimed_uploads_are_deleted_with_the_form(tmp_uploads):
+    form = _parse(_body(b"%PDF-1.4"), max_file_bytes=10_000, max_body_bytes=20_000)
+    assert len(os.listdir(tmp_uploads)) == 1
+    asyncio.run(form.close())
+    assert os.listdir(tmp_uploads) == []
+
+
+# Over the Content-Length limit (rejected before parsing), or only over the file cap.
+@pytest.mark.parametrize("extra", [FORM_OVERHEAD_BYTES + 1, 1])
+def test_extract_rejects_oversized_upload_with_413(tmp_uploads, monkeypatch, extra):
+    monkeypatch.setenv("RATE_LIMIT_DEFAULT", "off")
+    from app.main import create_app
+
+    client = TestClient(create_app())
+    big = os.urandom(MAX_FILE_BYTES + extra)
+    r = client.post("/api/extract", files={"file": ("a.pdf", big, "application/pdf")})
+    assert r.status_code == 413
+    assert os.listdir(tmp_uploads) == []
+
+
+def _archive(members: int, size: int):
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as zf:
+        for k in range(members):
+            zf.writestr(f"p{k}.pdf", os.urandom(size))
+    buf.seek(0)
+    return spool_fileobj(buf, 10**8)
+
+
+def test_zip_members_past_the_batch_limits_are_not_extracted(tmp_uploads):
+    items = _expand_zip(_archive(5, 100), "a.zip", [10**6], 2)
+    assert [i.upload is not None for i in items] == [True, True, False]
+    assert items[-1].filename == "a.zip" and "3 archive members were not read" in items[-1].error
+    assert len(os.listdir(tmp_uploads)) == 2  # the archive is gone, only two members were spooled
+
+    items = _expand_zip(_archive(2, 100), "b.zip", [150], 5)
+    assert [i.upload is not None for i in items] == [True, False]
+    assert len(os.listdir(tmp_uploads)) == 3  # refused from the header size, before extracting